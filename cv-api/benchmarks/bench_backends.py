@@ -0,0 +1,95 @@
+"""Benchmark: inference backends (PyTorch, ONNX Runtime fp32 and int8) on the goal clips.
+
+Runs every clip through HybridGoaldleCV once per --backends value, all in
+lockstep on the same frames. For each backend it reports the model time
+per frame (detect_batch: preprocessing, inference and postprocessing),
+the end-to-end tracking throughput, the detections per frame and the IoU
+of each frame's silhouettes with those of the first backend (the
+reference, torch by default). ONNX models are exported (and int8 ones
+calibrated on goals/*.mp4) on first use.
+
+Run from cv-api/:  python benchmarks/bench_backends.py [--backends torch onnx onnx-int8] [--size 640] [--threads N] [--max-frames 300] [clips...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from cv_processor import HybridGoaldleCV
+from inference_backends import BACKENDS
+from bench_keyframes import read_frames, silhouette_iou
+
+
+def time_detections(cv, stats):
+    """Wrap cv.detect_batch to add its seconds and detections to stats"""
+    detect_batch = cv.detect_batch
+
+    def timed(frames, imgsz=None):
+        t0 = time.perf_counter()
+        detections = detect_batch(frames, imgsz)
+        stats["model_s"] += time.perf_counter() - t0
+        stats["detections"] += sum(len(d) for d in detections)
+        return detections
+
+    cv.detect_batch = timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", nargs="*", help="videos (default: goals/*.mp4)")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--size", type=int, default=None, help="inference_size (default: full frames at 640)")
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads per backend")
+    parser.add_argument("--max-frames", type=int, default=300, help="frames per clip at most")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    clips = args.clips or sorted(glob.glob("goals/*.mp4"))
+    HybridGoaldleCV.inference_size = args.size
+    models, stats = {}, {}
+    for name in args.backends:
+        t0 = time.perf_counter()
+        models[name] = HybridGoaldleCV(backend=name, threads=args.threads)
+        print(f"{name}: loaded in {time.perf_counter() - t0:.1f} s")
+        stats[name] = {}
+        time_detections(models[name], stats[name])
+    reference = args.backends[0]
+
+    print(f"{'clip':<24}{'backend':>10}{'model ms':>10}{'fps':>8}{'dets':>7}{'mean IoU':>10}{'p5 IoU':>9}")
+    for clip in clips:
+        frames = read_frames(clip, args.max_frames)
+        if not frames:
+            print(f"{os.path.basename(clip):<24}  could not read")
+            continue
+        sessions = {}
+        for name, cv in models.items():
+            stats[name].update(model_s=0.0, detections=0, total_s=0.0)
+            sessions[name] = cv.new_session()
+        ious = {name: [] for name in args.backends}
+
+        for start in range(0, len(frames), args.batch_size):
+            batch = frames[start:start + args.batch_size]
+            outputs = {}
+            for name in args.backends:
+                copies = [frame.copy() for frame in batch]
+                t0 = time.perf_counter()
+                outputs[name] = sessions[name].process_batch(copies)
+                stats[name]["total_s"] += time.perf_counter() - t0
+            for n, output in enumerate(outputs[reference]):
+                silhouettes = (output == 0).all(axis=2)
+                for name in args.backends:
+                    ious[name].append(silhouette_iou(silhouettes, (outputs[name][n] == 0).all(axis=2)))
+
+        for name in args.backends:
+            values = np.array(ious[name])
+            print(f"{os.path.basename(clip):<24}{name:>10}{stats[name]['model_s'] / len(frames) * 1000:>10.1f}"
+                  f"{len(frames) / stats[name]['total_s']:>8.1f}{stats[name]['detections'] / len(frames):>7.1f}"
+                  f"{values.mean():>10.3f}{np.percentile(values, 5):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
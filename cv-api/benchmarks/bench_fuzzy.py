@@ -0,0 +1,111 @@
+"""Benchmark: fuzzy player-name matching on a large synthetic roster.
+
+Builds a roster of --players names (the real players plus generated
+ones), types each of --queries random players with 1-2 typos, and times
+PlayerIndex.resolve. Reports latency percentiles, how often the right
+player was matched outright or offered as a suggestion, and the time of
+a brute-force edit distance scan over the same roster for comparison.
+
+Run from cv-api/:  python benchmarks/bench_fuzzy.py [--players 10000] [--queries 2000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from player_index import PlayerIndex, bounded_edit_distance, normalize_name
+
+FIRST_NAMES = ["Lionel", "Kylian", "Mohamed", "Didier", "Son", "Lamine", "Tatsuya", "Erling", "Kevin", "Luka",
+               "Virgil", "Bruno", "Bukayo", "Jude", "Vinícius", "Rodrygo", "Federico", "Álvaro", "Joško", "Martin",
+               "Ousmane", "Sadio", "Riyad", "Hakim", "Achraf", "Takefusa", "Kaoru", "Heung", "Marcus", "Harry",
+               "Phil", "Declan", "Rúben", "João", "Bernardo", "Pedri", "Gavi", "Nicolò", "Lautaro", "Julián",
+               "Enzo", "Alexis", "Moisés", "Florian", "Jamal", "Leroy", "Kai", "Antoine", "Kingsley", "N'Golo"]
+SYLLABLES = ["ba", "be", "bi", "da", "de", "do", "ga", "gu", "ka", "ki", "ko", "la", "le", "li", "lo", "ma", "me",
+             "mi", "mo", "na", "ne", "no", "pa", "pe", "ra", "re", "ri", "ro", "sa", "se", "si", "ta", "te", "to",
+             "va", "vi", "za", "zo", "ch", "sch", "ić", "ez", "er", "an", "on", "el", "in", "son", "ski", "ov"]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_roster(size, rng):
+    with open("data/players_db.json", encoding="utf-8") as f:
+        names = [player["name"] for player in json.load(f)]
+    seen = {normalize_name(name) for name in names}
+    while len(names) < size:
+        surname = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        name = f"{rng.choice(FIRST_NAMES)} {surname}"
+        if normalize_name(name) not in seen:
+            seen.add(normalize_name(name))
+            names.append(name)
+    return [{"name": name} for name in names]
+
+
+def add_typos(name, rng):
+    """Misspell a name the way people type: drop/add/swap/replace a letter, lose accents or hyphens"""
+    typed = name
+    for _ in range(rng.randint(1, 2)):
+        kind = rng.choice(["delete", "insert", "replace", "swap", "plain"])
+        pos = rng.randrange(1, len(typed) - 1)
+        if kind == "delete":
+            typed = typed[:pos] + typed[pos + 1:]
+        elif kind == "insert":
+            typed = typed[:pos] + rng.choice(LETTERS) + typed[pos:]
+        elif kind == "replace":
+            typed = typed[:pos] + rng.choice(LETTERS) + typed[pos + 1:]
+        elif kind == "swap":
+            typed = typed[:pos - 1] + typed[pos] + typed[pos - 1] + typed[pos + 1:]
+        else:
+            typed = normalize_name(typed).replace(" ", "" if rng.random() < 0.3 else " ")
+    return typed
+
+
+def brute_force(keys, query, max_distance):
+    """Edit distance against every name, no index"""
+    return [k for k, key in enumerate(keys) if bounded_edit_distance(query, key, max_distance) is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    players = make_roster(args.players, rng)
+    start = time.perf_counter()
+    index = PlayerIndex(players)
+    build = time.perf_counter() - start
+
+    targets = [rng.randrange(len(players)) for _ in range(args.queries)]
+    queries = [add_typos(players[i]["name"], rng) for i in targets]
+    index.resolve(queries[0])  # warm up
+
+    latencies = np.empty(len(queries))
+    matched = suggested = 0
+    for n, (target, query) in enumerate(zip(targets, queries)):
+        start = time.perf_counter()
+        found, suggestions = index.resolve(query)
+        latencies[n] = time.perf_counter() - start
+        matched += found == target
+        suggested += found == target or target in suggestions
+
+    keys = [normalize_name(player["name"]) for player in players]
+    sample = queries[:50]
+    start = time.perf_counter()
+    for query in sample:
+        brute_force(keys, normalize_name(query), 3)
+    brute = (time.perf_counter() - start) / len(sample)
+
+    print(f"{len(players)} players, index built in {build * 1000:.0f} ms, {len(queries)} misspelled guesses")
+    print(f"resolve: mean {latencies.mean() * 1e6:.0f} us   p50 {np.percentile(latencies, 50) * 1e6:.0f} us   "
+          f"p99 {np.percentile(latencies, 99) * 1e6:.0f} us")
+    print(f"brute-force edit distance scan: {brute * 1e6:.0f} us per guess")
+    print(f"matched outright: {matched / len(queries):.1%}   right player matched or suggested: {suggested / len(queries):.1%}")
+
+
+if __name__ == "__main__":
+    main()
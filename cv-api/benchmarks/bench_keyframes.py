@@ -0,0 +1,88 @@
+"""Benchmark: keyframe mode quality and throughput against full detection.
+
+Runs every clip through full per-frame detection and through keyframe
+mode at each --intervals value, all in lockstep on the same frames. For
+each interval it reports the share of frames that were segmented, the
+tracking throughput and the IoU of each frame's silhouettes (blacked-out
+pixels) with the full-detection silhouettes, to help pick
+HybridGoaldleCV.keyframe_interval.
+
+Run from cv-api/:  python benchmarks/bench_keyframes.py [--intervals 2 3 5 8] [--change 10] [--max-frames 300] [clips...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from cv_processor import HybridGoaldleCV
+
+
+def read_frames(path, max_frames):
+    """Decoded frames, brightened so no source pixel is pure black (black = silhouette)"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(np.maximum(frame, 1))
+    cap.release()
+    return frames
+
+
+def silhouette_iou(a, b):
+    union = np.count_nonzero(a | b)
+    return np.count_nonzero(a & b) / union if union else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", nargs="*", help="videos (default: goals/*.mp4)")
+    parser.add_argument("--intervals", type=int, nargs="+", default=[2, 3, 5, 8])
+    parser.add_argument("--change", type=float, default=HybridGoaldleCV.keyframe_change,
+                        help="keyframe_change threshold (0 disables adaptive keyframes)")
+    parser.add_argument("--max-frames", type=int, default=300, help="frames per clip at most")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    clips = args.clips or sorted(glob.glob("goals/*.mp4"))
+    cv = HybridGoaldleCV()
+    modes = [1] + [k for k in args.intervals if k > 1]
+
+    print(f"{'clip':<24}{'interval':>9}{'segmented':>11}{'fps':>9}{'mean IoU':>10}{'p5 IoU':>9}{'min IoU':>9}")
+    for clip in clips:
+        frames = read_frames(clip, args.max_frames)
+        if not frames:
+            print(f"{os.path.basename(clip):<24}  could not read")
+            continue
+        sessions = {k: cv.new_session(keyframe_interval=k, keyframe_change=args.change or None) for k in modes}
+        seconds = dict.fromkeys(modes, 0.0)
+        ious = {k: [] for k in modes}
+
+        for start in range(0, len(frames), args.batch_size):
+            batch = frames[start:start + args.batch_size]
+            outputs = {}
+            for k in modes:
+                copies = [frame.copy() for frame in batch]
+                t0 = time.perf_counter()
+                outputs[k] = sessions[k].process_batch(copies)
+                seconds[k] += time.perf_counter() - t0
+            for n, reference in enumerate(outputs[1]):
+                full = (reference == 0).all(axis=2)
+                for k in modes:
+                    ious[k].append(silhouette_iou(full, (outputs[k][n] == 0).all(axis=2)))
+
+        for k in modes:
+            values = np.array(ious[k])
+            print(f"{os.path.basename(clip):<24}{k:>9}{sessions[k].keyframes / len(frames):>11.0%}"
+                  f"{len(frames) / seconds[k]:>9.1f}{values.mean():>10.3f}"
+                  f"{np.percentile(values, 5):>9.3f}{values.min():>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: silhouette accuracy vs throughput at several inference sizes.
+
+Runs every clip at full resolution (the model's default input size) and
+at each --sizes value of HybridGoaldleCV.inference_size, all in lockstep
+on the same frames. For each size it reports tracking throughput, the
+IoU of each frame's silhouettes with the full-resolution ones, and the
+silhouette area relative to full resolution (below 1 when small, distant
+players stop being detected).
+
+Run from cv-api/:  python benchmarks/bench_resolution.py [--sizes 640 480 320] [--max-frames 300] [clips...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from cv_processor import HybridGoaldleCV
+from bench_keyframes import read_frames, silhouette_iou
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", nargs="*", help="videos (default: goals/*.mp4)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[640, 480, 320])
+    parser.add_argument("--max-frames", type=int, default=300, help="frames per clip at most")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    clips = args.clips or sorted(glob.glob("goals/*.mp4"))
+    cv = HybridGoaldleCV()
+    modes = [None] + args.sizes
+
+    print(f"{'clip':<24}{'size':>7}{'fps':>9}{'mean IoU':>10}{'p5 IoU':>9}{'area':>8}")
+    for clip in clips:
+        frames = read_frames(clip, args.max_frames)
+        if not frames:
+            print(f"{os.path.basename(clip):<24}  could not read")
+            continue
+        sessions = {size: cv.new_session(inference_size=size) for size in modes}
+        seconds = dict.fromkeys(modes, 0.0)
+        ious = {size: [] for size in modes}
+        areas = dict.fromkeys(modes, 0)
+
+        for start in range(0, len(frames), args.batch_size):
+            batch = frames[start:start + args.batch_size]
+            outputs = {}
+            for size in modes:
+                copies = [frame.copy() for frame in batch]
+                t0 = time.perf_counter()
+                outputs[size] = sessions[size].process_batch(copies)
+                seconds[size] += time.perf_counter() - t0
+            for n, reference in enumerate(outputs[None]):
+                full = (reference == 0).all(axis=2)
+                for size in modes:
+                    silhouettes = (outputs[size][n] == 0).all(axis=2)
+                    ious[size].append(silhouette_iou(full, silhouettes))
+                    areas[size] += np.count_nonzero(silhouettes)
+
+        for size in modes:
+            values = np.array(ious[size])
+            area = areas[size] / areas[None] if areas[None] else 1.0
+            print(f"{os.path.basename(clip):<24}{size or 'full':>7}{len(frames) / seconds[size]:>9.1f}"
+                  f"{values.mean():>10.3f}{np.percentile(values, 5):>9.3f}{area:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Load benchmark: guesses/sec on each game session backend.
+
+Every guess does what the /game/guess endpoint does: load the session,
+make a guess, save the session (and start a new game when one ends).
+With --workers N the sqlite backend is hit by N processes sharing one
+database file, like N uvicorn workers behind one port.
+
+Run from cv-api/:  python benchmarks/bench_sessions.py [--sessions 1000] [--guesses 20000] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from game_logic import GoaldleGame
+from game_sessions import create_session_store
+
+
+def open_store(backend, db_path):
+    return create_session_store(backend, path=db_path)
+
+
+def play(game, store, session_ids, guesses, seed):
+    """Make `guesses` guesses on random sessions; returns per-guess latencies in seconds"""
+    rng = random.Random(seed)
+    names = [player["name"] for player in game.players]
+    latencies = np.empty(guesses)
+    for i in range(guesses):
+        session_id = rng.choice(session_ids)
+        start = time.perf_counter()
+        session = store.get(session_id)
+        if not session.has_game or len(session.guessed) >= game.max_guesses:
+            game.start_new_game(session)
+        guessed = {game.players[index]["name"] for index in session.guessed}
+        name = rng.choice([name for name in names if name not in guessed])
+        result = game.make_guess(session, name)
+        if result.get("game_over"):
+            game.start_new_game(session)
+        store.save(session)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def worker(backend, db_path, session_ids, guesses, seed, barrier, queue):
+    game = GoaldleGame()
+    store = open_store(backend, db_path)
+    # Start together so process startup isn't timed
+    barrier.wait()
+    start = time.perf_counter()
+    latencies = play(game, store, session_ids, guesses, seed)
+    wall = time.perf_counter() - start
+    store.close()
+    queue.put((latencies, wall))
+
+
+def bench(backend, db_path, sessions, guesses, workers):
+    game = GoaldleGame()
+    store = open_store(backend, db_path)
+    session_ids = []
+    for _ in range(sessions):
+        session = store.create()
+        game.start_new_game(session)
+        store.save(session)
+        session_ids.append(session.session_id)
+
+    if workers == 1:
+        start = time.perf_counter()
+        latencies = play(game, store, session_ids, guesses, seed=0)
+        wall = time.perf_counter() - start
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(workers)
+        queue = ctx.Queue()
+        per_worker = guesses // workers
+        procs = [ctx.Process(target=worker, args=(backend, db_path, session_ids, per_worker, seed, barrier, queue))
+                 for seed in range(workers)]
+        for proc in procs:
+            proc.start()
+        results = [queue.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        latencies = np.concatenate([latencies for latencies, _ in results])
+        wall = max(wall for _, wall in results)
+    store.close()
+
+    print(f"{backend:>7} x{workers}: {len(latencies) / wall:10.0f} guesses/s   "
+          f"p50 {np.percentile(latencies, 50) * 1e6:7.1f} us   p99 {np.percentile(latencies, 99) * 1e6:7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--guesses", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the sqlite database")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {args.guesses} guesses")
+    bench("memory", None, args.sessions, args.guesses, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("sqlite", os.path.join(tmp, "sessions.db"), args.sessions, args.guesses, 1)
+        if args.workers > 1:
+            bench("sqlite", os.path.join(tmp, "sessions.db"), args.sessions, args.guesses, args.workers)
+
+
+if __name__ == "__main__":
+    main()
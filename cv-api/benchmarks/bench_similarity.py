@@ -0,0 +1,87 @@
+"""Micro-benchmark: scalar vs vectorized detection/track similarity matrix.
+
+Run from cv-api/:  python benchmarks/bench_similarity.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tracking import calculate_similarity, similarity_matrix
+
+MAX_DISTANCE = 150
+MIN_IOU = 0.1
+
+
+def random_boxes(rng, n, width=1920, height=1080):
+    """Player-sized boxes scattered over a broadcast frame"""
+    x1 = rng.integers(0, width - 120, n)
+    y1 = rng.integers(0, height - 240, n)
+    w = rng.integers(25, 120, n)
+    h = rng.integers(50, 240, n)
+    return np.stack([x1, y1, x1 + w, y1 + h], axis=1)
+
+
+def jitter(rng, boxes, pixels=12):
+    """Move boxes a few pixels, like a track one frame later"""
+    return boxes + rng.integers(-pixels, pixels + 1, boxes.shape)
+
+
+def as_features(box, color):
+    x1, y1, x2, y2 = (int(v) for v in box)
+    return {
+        'centroid': ((x1 + x2) // 2, (y1 + y2) // 2),
+        'area': (x2 - x1) * (y2 - y1),
+        'avg_color': color,
+        'bbox': (x1, y1, x2, y2)
+    }
+
+
+def scalar_matrix(det_features, track_features):
+    matrix = np.zeros((len(det_features), len(track_features)))
+    for i, det in enumerate(det_features):
+        for j, track in enumerate(track_features):
+            matrix[i, j] = calculate_similarity(det, track, MAX_DISTANCE, MIN_IOU)
+    return matrix
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'dets':>5} {'tracks':>6} {'scalar ms':>10} {'vector ms':>10} {'speedup':>8}  match")
+
+    for n_dets, n_tracks in [(5, 5), (12, 20), (22, 30), (25, 60), (40, 100)]:
+        track_boxes = random_boxes(rng, n_tracks)
+        track_colors = rng.uniform(0, 255, (n_tracks, 3))
+        # Most detections are the previous tracks moved slightly, the rest are new
+        keep = min(n_dets, n_tracks)
+        det_boxes = np.concatenate([jitter(rng, track_boxes[:keep]), random_boxes(rng, n_dets - keep)])
+        det_colors = np.concatenate([track_colors[:keep] + rng.normal(0, 8, (keep, 3)),
+                                     rng.uniform(0, 255, (n_dets - keep, 3))])
+
+        det_features = [as_features(b, c) for b, c in zip(det_boxes, det_colors)]
+        track_features = [as_features(b, c) for b, c in zip(track_boxes, track_colors)]
+
+        expected = scalar_matrix(det_features, track_features)
+        actual = similarity_matrix(det_boxes, det_colors, track_boxes, track_colors, MAX_DISTANCE, MIN_IOU)
+        match = np.array_equal(expected, actual)
+
+        scalar_s = best_time(lambda: scalar_matrix(det_features, track_features), 20)
+        vector_s = best_time(lambda: similarity_matrix(det_boxes, det_colors, track_boxes, track_colors,
+                                                       MAX_DISTANCE, MIN_IOU), 200)
+        print(f"{n_dets:>5} {n_tracks:>6} {scalar_s * 1000:>10.3f} {vector_s * 1000:>10.3f} "
+              f"{scalar_s / vector_s:>7.1f}x  {'ok' if match else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
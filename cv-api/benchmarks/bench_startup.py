@@ -0,0 +1,117 @@
+"""Benchmark: API import time and cold start.
+
+Measures, each in a fresh interpreter:
+  - the time to import main (and its slowest imports, from -X importtime),
+    and whether any of the CV stack (torch, ultralytics, cv2, scipy) was
+    imported along with it
+  - cold start: time from launching uvicorn until /ready answers, until the
+    first game request is served, and until /ready?cv=true reports the model
+    loaded by the background warm-up
+
+Run from cv-api/:  python benchmarks/bench_startup.py [--port 8017] [--cv-timeout 180]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HEAVY_MODULES = ("torch", "ultralytics", "cv2", "scipy", "mediapipe")
+
+IMPORT_CHECK = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import():
+    result = subprocess.run([sys.executable, "-c", IMPORT_CHECK], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(count):
+    """(cumulative us, module) of the slowest top-level imports of main"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Direct imports of main (and main itself) are indented by at most two spaces
+        if len(name) - len(name.lstrip()) <= 3:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def get(url, timeout=1.0):
+    """HTTP status of a GET, or None if nothing answered"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def wait_for(url, deadline, status=200):
+    while time.perf_counter() < deadline:
+        if get(url) == status:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def measure_cold_start(port, cv_timeout):
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        results = {}
+        if not wait_for(f"{base}/ready", start + 60):
+            raise RuntimeError("API did not come up within 60s")
+        results["ready_s"] = time.perf_counter() - start
+        get(f"{base}/game/players")
+        results["first_game_response_s"] = time.perf_counter() - start
+        if wait_for(f"{base}/ready?cv=true", start + cv_timeout):
+            results["cv_ready_s"] = time.perf_counter() - start
+        with urllib.request.urlopen(f"{base}/ready") as response:
+            results["cv"] = json.loads(response.read())["cv"]
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8017)
+    parser.add_argument("--cv-timeout", type=float, default=180, help="seconds to wait for the model")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    args = parser.parse_args()
+
+    imported = measure_import()
+    print(f"import main: {imported['seconds'] * 1000:.0f} ms, "
+          f"CV modules imported: {', '.join(imported['heavy']) or 'none'}")
+    for cumulative, name in slowest_imports(args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    cold = measure_cold_start(args.port, args.cv_timeout)
+    print(f"cold start: /ready after {cold['ready_s']:.2f} s, "
+          f"first game response after {cold['first_game_response_s']:.2f} s")
+    if "cv_ready_s" in cold:
+        print(f"model loaded (background warm-up) after {cold['cv_ready_s']:.2f} s: {cold['cv']}")
+    else:
+        print(f"model not loaded within {args.cv_timeout:.0f} s: {cold['cv']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Benchmark suite: throughput, latency, memory and tracking stability of the CV pipeline.
+
+Runs the goal clips (or synthetic clips drawn here from a seed, the same
+on every machine) through TrackingSession.process_batch under each of
+--modes, each mode in a fresh process so its model load and peak RSS are
+its own. Frames are decoded outside the timed region. For every mode and
+clip it reports:
+
+  fps        frames per second through process_batch
+  p50/p99    per-frame latency: the frame's detection features, tracking
+             and compositing plus its share of the batch's model call
+  peak RSS   of the mode's process
+  churn      new track IDs per 100 frames other than on a shot's first
+             segmented frame (IDs lost and restarted mid-shot)
+  digest     SHA-1 of the blurred frames, to tell whether output changed
+
+Results are written as JSON (--out, default cache/benchmarks/<time>.json).
+--baseline compares them with an earlier results file and exits with 1 if
+fps, latency, RSS or churn got worse by more than --tolerance.
+
+Run from cv-api/:  python benchmarks/bench_suite.py [--modes full keyframes] [--set name=value ...] [--synthetic N] [--max-frames 300] [--out PATH] [--baseline PATH] [clips...]
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from importlib import metadata
+from multiprocessing import get_context
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from cv_processor import HybridGoaldleCV
+from metrics import STAGES
+
+# HybridGoaldleCV parameters of each mode (on top of the class defaults and --set)
+MODES = {
+    "full": {},
+    "keyframes": {"keyframe_interval": 3},
+    "downscaled": {"inference_size": 480},
+    "fast": {"keyframe_interval": 3, "inference_size": 320}
+}
+
+SYNTHETIC_SIZE = (1280, 720)
+SYNTHETIC_FRAMES = 150
+
+# Results compared with --baseline: key, True if higher is better
+COMPARED = (("fps", True), ("p50_ms", False), ("p99_ms", False), ("peak_rss_mb", False), ("churn", False))
+
+
+def synthetic_frames(seed, count):
+    """A broadcast-like clip: players running over a panning, mown pitch, with a camera cut halfway"""
+    rng = np.random.default_rng(seed)
+    width, height = SYNTHETIC_SIZE
+    for shot in range(2):
+        grass = rng.integers([30, 110, 30], [60, 170, 70])
+        kits = rng.integers(0, 256, (2, 3))
+        players = rng.uniform([0, height * 0.3], [width * 1.5, height * 0.9], (12, 2))
+        velocity = rng.normal(0, 3, (12, 2))
+        scale = rng.uniform(0.6, 1.4)
+        pan = rng.normal(0, 4)
+        for n in range(count // 2 if shot == 0 else count - count // 2):
+            offset = pan * n
+            frame = np.empty((height, width, 3), np.uint8)
+            frame[:] = grass
+            for x in range(int(-offset) % 160 - 160, width, 160):
+                frame[:, max(x, 0):max(x + 80, 0)] = np.minimum(grass + 20, 255)
+            for team, (x, y) in enumerate(players + velocity * n - [offset, 0]):
+                h = int(180 * scale * y / height)
+                x, y = int(x) % (width + 100) - 50, int(y)
+                color = tuple(int(c) for c in kits[team % 2])
+                cv2.rectangle(frame, (x - h // 6, y - h), (x + h // 6, y - h // 2), color, -1)
+                cv2.rectangle(frame, (x - h // 7, y - h // 2), (x + h // 7, y), (40, 40, 40), -1)
+                cv2.circle(frame, (x, y - h - h // 8), max(h // 8, 1), (120, 150, 200), -1)
+            yield frame
+
+
+def clip_frames(clip, max_frames):
+    """Decoded frames of clip (a video path or synthetic-<seed>), no pure black pixels (black = silhouette)"""
+    if clip.startswith("synthetic-"):
+        frames = synthetic_frames(int(clip.split("-", 1)[1]), min(max_frames, SYNTHETIC_FRAMES))
+        for frame in frames:
+            yield np.maximum(frame, 1)
+        return
+    cap = cv2.VideoCapture(clip)
+    for _ in range(max_frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield np.maximum(frame, 1)
+    cap.release()
+
+
+def batches(frames, size):
+    batch = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2**20 if sys.platform == "darwin" else peak / 2**10, 1)  # bytes on macOS, KiB elsewhere
+
+
+def frame_stats(trace):
+    """Per-frame latencies (s) and (IDs created, mid-shot IDs created) from a session's trace"""
+    latencies, created, churn, shot_start = [], 0, 0, True
+    for frame in sorted(trace):
+        values = trace[frame]
+        latencies.append(sum(values.get(stage, 0.0) for stage in STAGES))
+        shot_start = shot_start or values.get("cut", False)
+        if values.get("keyframe"):
+            created += values.get("created", 0)
+            churn += 0 if shot_start else values.get("created", 0)
+            shot_start = False
+    return latencies, created, churn
+
+
+def summarize(frames, seconds, latencies, created, churn):
+    latencies = np.array(latencies) * 1000
+    return {
+        "frames": frames,
+        "seconds": round(seconds, 4),
+        "fps": round(frames / seconds, 2) if seconds else 0.0,
+        "mean_ms": round(float(latencies.mean()), 3) if frames else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3) if frames else 0.0,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3) if frames else 0.0,
+        "ids": created,
+        "churn": round(100 * churn / frames, 2) if frames else 0.0
+    }
+
+
+def run_mode(mode, params, clips, args):
+    """Results of one mode over every clip; runs in its own process"""
+    for name, value in params.items():
+        setattr(HybridGoaldleCV, name, value)
+    t0 = time.perf_counter()
+    cv = HybridGoaldleCV(threads=args.threads)
+    load_s = time.perf_counter() - t0
+    results, pooled = [], {"frames": 0, "seconds": 0.0, "latencies": [], "created": 0, "churn": 0}
+
+    # The progress prints of process_batch would drown the table
+    with redirect_stdout(io.StringIO()):
+        for batch in batches(clip_frames(clips[0], args.warmup), args.batch_size):
+            cv.new_session().process_batch(batch)
+        for clip in clips:
+            session = cv.new_session(trace=True)
+            digest, seconds = hashlib.sha1(), 0.0
+            for batch in batches(clip_frames(clip, args.max_frames), args.batch_size):
+                t0 = time.perf_counter()
+                output = session.process_batch(batch)
+                seconds += time.perf_counter() - t0
+                for frame in output:
+                    digest.update(frame.tobytes())
+            if not session.frame_count:
+                results.append({"clip": clip, "error": "could not read"})
+                continue
+            latencies, created, churn = frame_stats(session.metrics.trace)
+            counters = session.metrics.counters
+            results.append({
+                "clip": clip,
+                **summarize(session.frame_count, seconds, latencies, created, churn),
+                "stages_ms": {stage: ms for stage, ms in session.metrics.summary().items() if ms},
+                "keyframes": counters["keyframes"],
+                "detections": counters["detections"],
+                "shot_cuts": counters["shot_cuts"],
+                "digest": digest.hexdigest()
+            })
+            for key, value in (("frames", session.frame_count), ("seconds", seconds), ("latencies", latencies),
+                               ("created", created), ("churn", churn)):
+                pooled[key] += value
+
+    return {
+        "mode": mode,
+        "params": HybridGoaldleCV.cache_params(),
+        "load_s": round(load_s, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        **summarize(pooled["frames"], pooled["seconds"], pooled["latencies"], pooled["created"], pooled["churn"]),
+        "clips": results
+    }
+
+
+def parse_value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text  # a bare string, e.g. backend=onnx
+
+
+def environment():
+    versions = {}
+    for package in ("numpy", "opencv-python", "torch", "ultralytics", "onnxruntime"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            pass
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(), "packages": versions}
+
+
+def compare(results, baseline, tolerance):
+    """Print each mode's change against the baseline; returns the regressions found"""
+    regressions = []
+    previous = {mode["mode"]: mode for mode in baseline["modes"]}
+    print(f"\nAgainst {baseline['created']}:")
+    for mode in results["modes"]:
+        old = previous.get(mode["mode"])
+        if old is None:
+            print(f"  {mode['mode']}: not in baseline")
+            continue
+        if old["params"] != mode["params"]:
+            print(f"  {mode['mode']}: ⚠️ parameters differ from the baseline's")
+        changes = []
+        for key, higher_is_better in COMPARED:
+            before, after = old[key], mode[key]
+            worse = before - after if higher_is_better else after - before
+            # Churn is often near 0: allow at least tolerance x 10 more IDs per 100 frames
+            limit = tolerance * max(abs(before), 10 if key == "churn" else 0)
+            flag = ""
+            if worse > limit:
+                flag = " ❌"
+                regressions.append(f"{mode['mode']} {key}: {before} -> {after}")
+            changes.append(f"{key} {before} -> {after}{flag}")
+        print(f"  {mode['mode']}: " + ", ".join(changes))
+        old_digests = {clip["clip"]: clip.get("digest") for clip in old["clips"]}
+        changed = [clip["clip"] for clip in mode["clips"]
+                   if clip["clip"] in old_digests and clip.get("digest") != old_digests[clip["clip"]]]
+        if changed:
+            print(f"    output changed on {', '.join(os.path.basename(clip) for clip in changed)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", nargs="*", help="videos (default: goals/*.mp4 unless --synthetic)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["full", "keyframes"])
+    parser.add_argument("--set", nargs="+", default=[], metavar="NAME=VALUE",
+                        help="HybridGoaldleCV parameters for every mode, e.g. backend=onnx max_distance=100")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N", help="add N synthetic clips (seeds 0..N-1)")
+    parser.add_argument("--max-frames", type=int, default=300, help="frames per clip at most")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=8, help="untimed frames run before each mode")
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads of the model")
+    parser.add_argument("--out", default=None, help="results JSON (default: cache/benchmarks/<time>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="allowed relative slowdown or growth before failing")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.set:
+        name, sep, value = item.partition("=")
+        if not sep or not hasattr(HybridGoaldleCV, name):
+            parser.error(f"--set expects NAME=VALUE with a HybridGoaldleCV parameter, got {item!r}")
+        overrides[name] = parse_value(value)
+    clips = args.clips or ([] if args.synthetic else sorted(glob.glob("goals/*.mp4")))
+    clips += [f"synthetic-{seed}" for seed in range(args.synthetic)]
+    if not clips:
+        parser.error("no clips: none given and goals/*.mp4 is empty")
+
+    results = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(),
+               "settings": {"clips": clips, "max_frames": args.max_frames, "batch_size": args.batch_size,
+                            "warmup": args.warmup, "threads": args.threads, "set": overrides},
+               "modes": []}
+    print(f"{'mode':<12}{'clip':<24}{'frames':>7}{'fps':>8}{'p50 ms':>9}{'p99 ms':>9}{'ids':>6}{'churn':>7}")
+    for mode in args.modes:
+        # A fresh process per mode: its own model, class parameters and peak RSS
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_mode, mode, {**MODES[mode], **overrides}, clips, args).result()
+        results["modes"].append(result)
+        for clip in result["clips"]:
+            name = os.path.basename(clip["clip"])
+            if "error" in clip:
+                print(f"{mode:<12}{name:<24}  {clip['error']}")
+                continue
+            print(f"{mode:<12}{name:<24}{clip['frames']:>7}{clip['fps']:>8.1f}{clip['p50_ms']:>9.1f}"
+                  f"{clip['p99_ms']:>9.1f}{clip['ids']:>6}{clip['churn']:>7.2f}")
+        print(f"{mode:<12}{'all':<24}{result['frames']:>7}{result['fps']:>8.1f}{result['p50_ms']:>9.1f}"
+              f"{result['p99_ms']:>9.1f}{result['ids']:>6}{result['churn']:>7.2f}"
+              f"   peak RSS {result['peak_rss_mb']:.0f} MB, model load {result['load_s']:.1f} s")
+
+    out = args.out or os.path.join("cache", "benchmarks", f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"📊 Results written to {out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+# Goaldle CV processing - YOLOv8 segmentation + Hungarian tracking + silhouettes
+import os
+import base64
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import List
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from video_pipeline import VideoPipeline
+from inference_backends import create_backend, letterbox
+from metrics import PipelineMetrics
+from shot_detection import ShotBoundaryDetector, thumbnails
+from tracking import MIN_MATCH_SIMILARITY, TrackTable, calculate_similarity, iou, similarity_matrix
+
+# HybridGoaldleCV parameters each TrackingSession takes a copy of (new_session can override them)
+SESSION_SETTINGS = ("keyframe_interval", "keyframe_change", "shot_detection", "inference_size")
+
+# Pixels kept around each mask crop: the 3x3 closing reaches 2 pixels and the
+# 3x3 blur 1 more, so nothing outside this margin can change
+MASK_MARGIN = 4
+
+
+def box_means(image, boxes):
+    """Mean BGR color inside each (x1, y1, x2, y2) box of image (zeros for an empty box).
+    
+    All boxes are read off one integral image of the region they span, so
+    the cost doesn't grow with their number or size.
+    """
+    h, w = image.shape[:2]
+    boxes = np.clip(boxes, 0, [w, h, w, h])
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    if not areas.any():
+        return np.zeros((len(boxes), 3))
+    left, top = boxes[:, :2].min(axis=0)
+    right, bottom = boxes[:, 2:].max(axis=0)
+    region = image[top:bottom, left:right]
+    # int32 sums are exact (and faster) as long as a whole-region sum fits
+    depth = cv2.CV_32S if region.shape[0] * region.shape[1] * 255 < 2**31 else cv2.CV_64F
+    sums = cv2.integral(region, sdepth=depth)
+    x1, y1, x2, y2 = (boxes - [left, top, left, top]).T
+    totals = sums[y2, x2] - sums[y1, x2] - sums[y2, x1] + sums[y1, x1]
+    return np.where(areas[:, None] > 0, totals / np.maximum(areas, 1)[:, None], 0.0)
+
+
+@dataclass
+class FrameDetections:
+    """One frame's detections that passed the size filter, in frame pixels.
+    
+    boxes (N, 4) int, scores (N,), colors (N, 3) mean BGR inside each box,
+    and masks the N model-resolution masks (views into the model output).
+    """
+    boxes: np.ndarray
+    scores: np.ndarray
+    colors: np.ndarray
+    masks: List[np.ndarray]
+    
+    def __len__(self):
+        return len(self.boxes)
+
+
+def warp_mask(mask, old_bbox, new_bbox, frame_shape):
+    """Move a model-resolution mask so the region of old_bbox lands on new_bbox (frame coordinates)"""
+    (mh, mw), (h, w) = mask.shape, frame_shape[:2]
+    left, top, width, height = letterbox(mask.shape, frame_shape)
+    ox1, oy1, ox2, oy2 = old_bbox
+    nx1, ny1, nx2, ny2 = new_bbox
+    # x' = a*x + b in frame pixels is u' = a*u + (1-a)*left + b*width/w in mask pixels
+    ax = (nx2 - nx1) / max(ox2 - ox1, 1)
+    ay = (ny2 - ny1) / max(oy2 - oy1, 1)
+    matrix = np.float32([[ax, 0, (1 - ax) * left + (nx1 - ax * ox1) * width / w],
+                         [0, ay, (1 - ay) * top + (ny1 - ay * oy1) * height / h]])
+    return cv2.warpAffine(mask, matrix, (mw, mh), flags=cv2.INTER_LINEAR, borderValue=0)
+
+class HybridGoaldleCV:
+    # Detection/tracking parameters. These are class-level so the processed
+    # video cache key (cache_params) is known without loading the model.
+    # Use medium model for better accuracy (you can switch back to 'yolov8n-seg.pt' if too slow)
+    model_name = 'yolov8n-seg.pt'  # Use smaller model to avoid GitHub file size limits
+    max_disappeared = 30  # Your good parameter
+    min_confidence = 0.3  # Your parameter - keeps more detections
+    max_distance = 150    # Your parameter - more lenient matching
+    min_iou = 0.1         # Your parameter
+    # Keyframe mode: segment every keyframe_interval-th frame (1 = every frame) and
+    # move the last keyframe's silhouettes along each track's motion in between.
+    # A frame whose thumbnail differs from the last keyframe's by more than
+    # keyframe_change (mean absolute gray level) is always a keyframe.
+    keyframe_interval = 1
+    keyframe_change = 10.0
+    # Camera cuts drop every track (no matching across shots), so a cut frame
+    # is always segmented: the new shot's players are never left unmasked
+    shot_detection = True
+    # Long side, in pixels, that frames are shrunk to (once) before segmentation;
+    # None feeds full frames at the model's default size. Boxes are mapped back
+    # to full-frame pixels for tracking, masks only when compositing.
+    inference_size = None
+    # Inference backend (inference_backends.py): "torch", or an ONNX Runtime export
+    # of the model, "onnx" or "onnx-int8" (exported once, next to the weights)
+    backend = os.environ.get("CV_BACKEND", "torch")
+    # Directory that gets a JSON-lines trace (stage times, detections, tracks) of
+    # every frame of every processed video; None keeps only the aggregate metrics
+    trace_dir = os.environ.get("CV_TRACE_DIR")
+    
+    def __init__(self, backend=None, threads=None):
+        if backend is not None:
+            self.backend = backend
+        # Loaded once and shared by every TrackingSession
+        self.model = create_backend(self.backend, self.model_name, self.inference_size, threads)
+        self.model_lock = threading.Lock()
+        self.batch_size = 8        # Frames per YOLO call in process_video (1 = per-frame)
+        self.queue_size = 32       # Max frames buffered between pipeline stages
+        self.mask_maps = {}
+        
+    def calculate_similarity(self, det_features, track_features):
+        """Lightweight similarity calculation (scalar reference for similarity_matrix)"""
+        return calculate_similarity(det_features, track_features, self.max_distance, self.min_iou)
+    
+    def detect_batch(self, frames, imgsz=None):
+        """Run segmentation on a list of frames (from TrackingSession.inference_frame) in a single model call.
+        
+        imgsz is the model's input size (a session's inference_size; None
+        for the backend's default). Returns one inference_backends.Detections
+        per frame.
+        """
+        # The ultralytics predictor is not thread-safe; sessions share the model one call at a time
+        with self.model_lock:
+            return self.model.predict(frames, self.min_confidence, imgsz)
+    
+    def new_session(self, trace=False, **settings):
+        """Fresh per-video tracker state that shares this (already loaded) model.
+        
+        settings override this instance's SESSION_SETTINGS for the session only.
+        """
+        return TrackingSession(self, trace, **settings)
+    
+    def extract_detections(self, frame, detections, source=None):
+        """Size-filter a frame's Detections and compute their tracking features, all at once.
+        
+        source is the downscaled copy of frame the model saw, if any; boxes
+        are returned in frame pixels either way and colors are taken from
+        the image the model saw.
+        """
+        color_boxes = detections.boxes.astype(np.int64)
+        boxes = color_boxes
+        if source is not None and source.shape != frame.shape:
+            scale = np.array([frame.shape[1] / source.shape[1], frame.shape[0] / source.shape[0]] * 2)
+            boxes = (detections.boxes * scale).astype(np.int64)
+        else:
+            source = frame
+        
+        # Basic size filtering
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        keep = np.flatnonzero(areas > 500)  # Minimum reasonable size
+        return FrameDetections(boxes[keep], detections.scores[keep], box_means(source, color_boxes[keep]),
+                               [detections.masks[i] for i in keep])
+    
+    def iou(self, bbox1, bbox2):
+        """Your IoU function"""
+        return iou(bbox1, bbox2)
+    
+    def mask_index_maps(self, mask_shape, frame_shape):
+        """Source row/col of every frame pixel under an INTER_NEAREST mask resize (cached).
+        
+        Only the letterboxed part of the mask that covers the frame is
+        stretched back over it, so silhouettes line up at any inference size.
+        """
+        key = (mask_shape, frame_shape)
+        if key not in self.mask_maps:
+            h, w = frame_shape
+            left, top, width, height = letterbox(mask_shape, frame_shape)
+            # Resizing an index ramp gives exactly the pixel mapping cv2.resize uses
+            rows = cv2.resize(np.arange(top, top + height, dtype=np.float32)[:, None], (1, h),
+                              interpolation=cv2.INTER_NEAREST)
+            cols = cv2.resize(np.arange(left, left + width, dtype=np.float32)[None, :], (w, 1),
+                              interpolation=cv2.INTER_NEAREST)
+            self.mask_maps[key] = (rows.ravel().astype(np.intp), cols.ravel().astype(np.intp))
+        return self.mask_maps[key]
+    
+    def blur_players(self, frame, tracks, inplace=False):
+        """Your improved mask processing.
+        
+        Each mask is only rasterized inside the frame region it covers (plus
+        MASK_MARGIN pixels for the closing and smoothing), instead of being
+        resized and filtered at full frame size. Outside that region the
+        full-frame result is always zero, so the output is pixel-identical.
+        """
+        result = frame if inplace else frame.copy()
+        h, w = frame.shape[:2]
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        
+        for x1, y1, x2, y2, track_id, mask in tracks:
+            rows, cols = self.mask_index_maps(mask.shape, (h, w))
+            
+            # Frame rows/cols whose source mask row/col has any pixel above threshold
+            row_hits = np.flatnonzero((mask.max(axis=1) > 0.5)[rows])
+            if len(row_hits) == 0:
+                continue
+            col_hits = np.flatnonzero((mask.max(axis=0) > 0.5)[cols])
+            top = max(row_hits[0] - MASK_MARGIN, 0)
+            bottom = min(row_hits[-1] + MASK_MARGIN + 1, h)
+            left = max(col_hits[0] - MASK_MARGIN, 0)
+            right = min(col_hits[-1] + MASK_MARGIN + 1, w)
+            
+            # Resize only the crop
+            mask_crop = mask[rows[top:bottom, None], cols[None, left:right]]
+            
+            # Your tight mask processing
+            binary_mask = (mask_crop > 0.5).astype(np.uint8)  # Higher threshold
+            
+            # Minimal morphological operations
+            binary_mask = cv2.morphologyEx(binary_mask, cv2.MORPH_CLOSE, kernel)
+            
+            # Light smoothing
+            binary_mask = cv2.GaussianBlur(binary_mask.astype(np.float32), (3, 3), 0)
+            
+            # Apply black silhouette
+            result[top:bottom, left:right][binary_mask > 0.5] = 0
+        
+        return result
+    
+    @classmethod
+    def cache_params(cls):
+        """Parameters that change the processed output (part of the cache key)"""
+        return {
+            "model": cls.model_name,
+            "min_confidence": cls.min_confidence,
+            "max_distance": cls.max_distance,
+            "min_iou": cls.min_iou,
+            "max_disappeared": cls.max_disappeared,
+            "keyframe_interval": cls.keyframe_interval,
+            "keyframe_change": cls.keyframe_change,
+            "shot_detection": cls.shot_detection,
+            "inference_size": cls.inference_size,
+            "backend": cls.backend
+        }
+    
+    def blur_video(self, video_bytes, batch_size=None, on_progress=None):
+        """Blur all players in a video and return (blurred video bytes, video_info).
+        
+        Every call tracks with its own TrackingSession, so several videos can
+        be processed concurrently on one instance without sharing tracks.
+        
+        Decoding, inference/tracking and encoding run as a pipeline (see
+        VideoPipeline). Frames are segmented batch_size at a time with one
+        YOLO call per batch; tracking and masking still run frame by frame in
+        order, so the output matches the per-frame path (batch_size=1).
+        """
+        # Save video
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as f:
+            f.write(video_bytes)
+            temp_path = f.name
+        
+        output_path = temp_path.replace('.mp4', '_blurred.mp4')
+        try:
+            video_info = self.blur_file(temp_path, output_path, batch_size, on_progress)
+            
+            # Read result
+            with open(output_path, 'rb') as f:
+                result_bytes = f.read()
+        finally:
+            # Cleanup
+            for path in (temp_path, output_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+        
+        return result_bytes, video_info
+    
+    def blur_file(self, input_path, output_path, batch_size=None, on_progress=None, trace_path=None):
+        """Blur all players in the video at input_path into output_path; returns video_info.
+        
+        video_info["metrics"] has the clip's stage timing histograms and
+        counters (metrics.PipelineMetrics.as_dict()). A per-frame trace is
+        written to trace_path, or into trace_dir if that is set.
+        """
+        batch_size = max(1, batch_size or self.batch_size)
+        if trace_path is None and self.trace_dir:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            name = os.path.splitext(os.path.basename(input_path))[0]
+            trace_path = os.path.join(self.trace_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}.jsonl")
+        session = self.new_session(trace=trace_path is not None)
+        pipeline = VideoPipeline(session.process_batch, batch_size=batch_size, queue_size=self.queue_size,
+                                 metrics=session.metrics)
+        video_info = pipeline.run(input_path, output_path, on_progress=on_progress)
+        video_info["keyframes"] = session.keyframes
+        fps = video_info["fps"]
+        video_info["shot_cuts"] = [
+            {"frame": frame, "time": round(frame / fps, 3) if fps else None} for frame in session.cuts
+        ]
+        
+        timings = video_info["pipeline"]
+        session.metrics.count("clips")
+        session.metrics.clip_seconds.observe(timings["wall_s"])
+        video_info["metrics"] = session.metrics.as_dict()
+        if trace_path is not None:
+            session.metrics.write_trace(trace_path)
+            video_info["trace"] = trace_path
+        print(f"Pipeline: {timings['throughput_fps']} fps, bottleneck: {timings['bottleneck']}")
+        return video_info
+    
+    def process_video(self, video_bytes, batch_size=None, cache=None):
+        """Blur all players in a video and return the API result dict (base64 video).
+        
+        With a ProcessedVideoCache, a clip already processed with the same
+        parameters is returned from the cache without running the pipeline.
+        """
+        try:
+            if cache is not None:
+                cache_key = cache.make_key(video_bytes, self.cache_params())
+                cached = cache.get(cache_key)
+                if cached:
+                    result_bytes, video_info = cached
+                    return {
+                        "success": True,
+                        "blurred_video": base64.b64encode(result_bytes).decode(),
+                        "video_info": video_info,
+                        "cached": True
+                    }
+            
+            result_bytes, video_info = self.blur_video(video_bytes, batch_size)
+            
+            if cache is not None:
+                cache.put(cache_key, result_bytes, video_info)
+            
+            return {
+                "success": True,
+                "blurred_video": base64.b64encode(result_bytes).decode(),
+                "video_info": video_info,
+                "cached": False
+            }
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+
+class TrackingSession:
+    """Tracker state for one video: tracks, id counter and frame count.
+    
+    Created per processing run by HybridGoaldleCV.new_session(); the
+    (expensive) model stays on the shared HybridGoaldleCV. The
+    SESSION_SETTINGS are read from it once, here, unless given as keywords.
+    """
+    def __init__(self, cv, trace=False, **settings):
+        unknown = set(settings) - set(SESSION_SETTINGS)
+        if unknown:
+            raise TypeError(f"Unknown session settings: {', '.join(sorted(unknown))}")
+        self.cv = cv
+        for name in SESSION_SETTINGS:
+            setattr(self, name, settings.get(name, getattr(cv, name)))
+        self.metrics = PipelineMetrics(trace)  # stage timings and counters of this video
+        self.tracks = TrackTable()
+        self.next_id = 0
+        self.frame_count = 0
+        self.keyframes = 0          # frames that went through detection
+        self.since_keyframe = 0
+        self.key_thumbnail = None
+        self.key_tracks = []        # last keyframe's tracks and their bbox velocities
+        self.key_velocities = []
+        self.shots = ShotBoundaryDetector() if self.shot_detection else None
+        self.cuts = []              # frame numbers where a new shot starts
+    
+    def inference_frame(self, frame):
+        """frame shrunk so its long side is inference_size (never enlarged), or frame itself"""
+        if self.inference_size is None:
+            return frame
+        h, w = frame.shape[:2]
+        scale = self.inference_size / max(h, w)
+        if scale >= 1:
+            return frame
+        return cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    
+    def schedule(self, frame, force=False):
+        """(detect, since): whether frame is a keyframe, and how many frames after the last keyframe it is.
+        
+        Called right after the shot detector has seen frame, so its thumbnail is reused.
+        """
+        interval = self.keyframe_interval
+        since = self.since_keyframe + 1
+        detect = force or interval <= 1 or self.key_thumbnail is None or since >= interval
+        if interval > 1:
+            thumbnail = self.shots.thumbnail if self.shots is not None else thumbnails(frame)[1]
+            if not detect and self.keyframe_change is not None:
+                detect = cv2.absdiff(thumbnail, self.key_thumbnail).mean() > self.keyframe_change
+            if detect:
+                self.key_thumbnail = thumbnail
+        self.since_keyframe = 0 if detect else since
+        return detect, since
+    
+    def detect_and_track(self, frame, results=None, elapsed=1, source=None, times=None):
+        """Track the frame's detections; times, if given, gets the stage seconds added to it"""
+        times = {} if times is None else times
+        # YOLOv8 detection with your parameters (skipped if results, the frame's
+        # Detections, come from detect_batch; source is then the frame given to the model)
+        start = time.perf_counter()
+        if results is None:
+            source = self.inference_frame(frame)
+            results = self.cv.detect_batch([source], self.inference_size)[0]
+            times["inference"] = time.perf_counter() - start
+            start = time.perf_counter()
+        detections = self.cv.extract_detections(frame, results, source)
+        extracted = time.perf_counter()
+        times["features"] = times.get("features", 0.0) + extracted - start
+        self.metrics.detections.observe(len(detections))
+        self.metrics.count("detections", len(detections))
+        self.metrics.note(self.frame_count, detections=len(detections))
+        
+        # Use Hungarian algorithm for assignment (prevents blinking)
+        if len(detections) > 0 and len(self.tracks) > 0:
+            current_tracks = self.assign_with_hungarian(detections, elapsed)
+        else:
+            # Initialize tracks for first frame or when no existing tracks
+            current_tracks = self.initialize_tracks(detections)
+        
+        # Clean up old tracks
+        self.cleanup_tracks(current_tracks)
+        times["assignment"] = time.perf_counter() - extracted
+        
+        self.keyframes += 1
+        self.metrics.count("keyframes")
+        if self.keyframe_interval > 1:
+            live = np.flatnonzero(self.tracks.live)
+            slot_of = dict(zip(self.tracks.ids[live].tolist(), live.tolist()))
+            self.key_tracks = current_tracks
+            self.key_velocities = self.tracks.velocities[[slot_of[track[4]] for track in current_tracks]]
+        
+        return current_tracks
+    
+    def propagate_tracks(self, frame, offset):
+        """The last keyframe's tracks moved offset frames along their velocity, masks warped to match"""
+        current_tracks = []
+        for (x1, y1, x2, y2, track_id, mask), velocity in zip(self.key_tracks, self.key_velocities):
+            bbox = tuple(int(round(v)) for v in np.array([x1, y1, x2, y2]) + velocity * offset)
+            if not velocity.any():
+                current_tracks.append((x1, y1, x2, y2, track_id, mask))
+                continue
+            current_tracks.append((*bbox, track_id, warp_mask(mask, (x1, y1, x2, y2), bbox, frame.shape)))
+        return current_tracks
+    
+    def assign_with_hungarian(self, detections, elapsed=1):
+        """Hungarian algorithm assignment.
+        
+        elapsed is the number of frames since the last detection step; in
+        keyframe mode tracks are matched at their extrapolated position.
+        """
+        slots = self.tracks.candidates(self.cv.max_disappeared)
+        
+        if len(slots) == 0:
+            return self.initialize_tracks(detections)
+        
+        # Build similarity matrix for all detection/track pairs at once
+        det_boxes, det_colors = detections.boxes, detections.colors
+        if self.keyframe_interval > 1:
+            track_boxes = self.tracks.predicted(slots, elapsed)
+        else:
+            track_boxes = self.tracks.bboxes[slots]
+        scores = similarity_matrix(det_boxes, det_colors, track_boxes, self.tracks.colors[slots],
+                                   self.cv.max_distance, self.cv.min_iou)
+        
+        # Hungarian assignment (maximize similarity)
+        row_indices, col_indices = linear_sum_assignment(-scores)
+        matched = scores[row_indices, col_indices] > MIN_MATCH_SIMILARITY  # Minimum threshold
+        rows, cols = row_indices[matched], col_indices[matched]
+        
+        # Update matched tracks
+        self.tracks.update(slots[cols], det_boxes[rows], det_colors[rows], elapsed)
+        current_tracks = [(*bbox, track_id, detections.masks[row]) for row, bbox, track_id in
+                          zip(rows, det_boxes[rows].tolist(), self.tracks.ids[slots[cols]].tolist())]
+        
+        # Create new tracks for unassigned detections
+        assigned_detections = np.zeros(len(detections), dtype=bool)
+        assigned_detections[rows] = True
+        current_tracks.extend(self.initialize_tracks(detections, np.flatnonzero(~assigned_detections)))
+        
+        # Update frames for unassigned tracks
+        unassigned = np.ones(len(slots), dtype=bool)
+        unassigned[cols] = False
+        self.tracks.age(slots[unassigned], elapsed)
+        
+        return current_tracks
+    
+    def initialize_tracks(self, detections, rows=None):
+        """Start a track for each detection (or only those in rows), e.g. on the first frame"""
+        current_tracks = []
+        rows = range(len(detections)) if rows is None else rows
+        self.metrics.count("tracks_created", len(rows))
+        self.metrics.note(self.frame_count, created=len(rows))
+        for row in rows:
+            track_id = self.next_id
+            self.next_id += 1
+            
+            self.tracks.add(track_id, detections.boxes[row], detections.colors[row])
+            
+            current_tracks.append((*detections.boxes[row].tolist(), track_id, detections.masks[row]))
+        
+        return current_tracks
+    
+    def cleanup_tracks(self, current_tracks):
+        """Remove old tracks.
+        
+        A track unmatched for max_disappeared frames is no longer a matching
+        candidate, so it is evicted then and its slot reused.
+        """
+        self.metrics.count("tracks_evicted", self.tracks.evict(self.cv.max_disappeared))
+    
+    def flush_tracks(self):
+        """Forget every track, at a camera cut"""
+        self.metrics.count("tracks_evicted", len(self.tracks))
+        self.tracks.clear()
+        self.key_tracks = []
+        self.key_velocities = []
+    
+    def process_batch(self, frames):
+        """Segment a batch of frames in one call, then track and mask each frame in order.
+        
+        In keyframe mode only the batch's keyframes are segmented; the
+        other frames reuse the propagated tracks of the keyframe before them.
+        Tracks are flushed at camera cuts, which are always keyframes. Every frame's stage times go to
+        self.metrics: shot detection and keyframe scheduling count as
+        features, the batch's model call is shared among its keyframes.
+        """
+        start = time.perf_counter()
+        cuts, plan = [], []
+        for frame in frames:
+            cut = self.shots is not None and self.shots.update(frame)
+            cuts.append(cut)
+            plan.append(self.schedule(frame, force=cut))
+        sources = [self.inference_frame(frame) for frame, (detect, _) in zip(frames, plan) if detect]
+        planned = time.perf_counter()
+        batch_results = iter(zip(self.cv.detect_batch(sources, self.inference_size), sources) if sources else [])
+        inference = (time.perf_counter() - planned) / max(len(sources), 1)
+        analysis = (planned - start) / len(frames)
+        processed = []
+        
+        for frame, cut, (detect, since) in zip(frames, cuts, plan):
+            times = {"features": analysis}
+            if cut:
+                self.cuts.append(self.frame_count)
+                self.metrics.count("shot_cuts")
+                self.flush_tracks()
+            if detect:
+                result, source = next(batch_results)
+                times["inference"] = inference
+                tracks = self.detect_and_track(frame, results=result, elapsed=since, source=source, times=times)
+            else:
+                start = time.perf_counter()
+                tracks = self.propagate_tracks(frame, since)
+                times["assignment"] = time.perf_counter() - start
+            start = time.perf_counter()
+            processed.append(self.cv.blur_players(frame, tracks, inplace=True))  # decoded frame isn't reused
+            times["compositing"] = time.perf_counter() - start
+            
+            for stage, seconds in times.items():
+                self.metrics.observe(stage, seconds, self.frame_count)
+            self.metrics.tracks.observe(len(tracks))
+            self.metrics.note(self.frame_count, keyframe=bool(detect), cut=bool(cut), tracks=len(tracks))
+            self.metrics.count("frames")
+            self.frame_count += 1
+            if self.frame_count % 30 == 0:
+                active_tracks = self.tracks.count_active(5)
+                print(f"Processed {self.frame_count} frames - Active tracks: {active_tracks}")
+        
+        return processed
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from video_manager import VideoManager
+
+# Challenge #1; the dates offered in the game's daily dropdown start here
+DAILY_EPOCH = date(2025, 7, 27)
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def day_start(day: date) -> datetime:
+    """Midnight UTC at the start of a day, when that day's challenge goes live"""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class DailySchedule:
+    """Deterministic goal-of-the-day schedule.
+
+    Days are grouped into cycles of len(goal_ids) days; each cycle is a
+    shuffle of every goal seeded by (seed, cycle number), so every server
+    computes the same schedule, each goal appears once per cycle and no goal
+    runs two days in a row. The first precompute_days days are built at
+    startup and later ones appended on demand; lookups are list indexing.
+    The schedule depends on the seed and the list of goal ids.
+    """
+    def __init__(self, goal_ids: List[str], seed: str = "goaldle", epoch: date = DAILY_EPOCH,
+                 precompute_days: int = 2 * 366):
+        if not goal_ids:
+            raise ValueError("Daily schedule needs at least one goal")
+        self.goal_ids = list(goal_ids)
+        self.seed = seed
+        self.epoch = epoch
+        self.days: List[str] = []
+        self.lock = threading.Lock()
+        self._extend(precompute_days)
+
+    def _extend(self, length: int):
+        while len(self.days) < length:
+            cycle = len(self.days) // len(self.goal_ids)
+            order = list(self.goal_ids)
+            random.Random(f"{self.seed}:{cycle}").shuffle(order)
+            if self.days and len(order) > 1 and order[0] == self.days[-1]:
+                order[0], order[1] = order[1], order[0]
+            self.days.extend(order)
+
+    def challenge_number(self, day: date) -> int:
+        return (day - self.epoch).days + 1
+
+    def goal_id_for(self, day: date) -> Optional[str]:
+        """Goal id scheduled for a day, or None before the first challenge"""
+        index = (day - self.epoch).days
+        if index < 0:
+            return None
+        if index >= len(self.days):
+            with self.lock:
+                self._extend(index + 1)
+        return self.days[index]
+
+
+class DailyChallenges:
+    """Rendered daily challenge responses, one shared object per date.
+
+    Each date's payload (goal id, pre-resolved blurred video URL, game
+    settings, never the scorer) is built once, serialized to JSON bytes
+    and kept with its ETag, so serving today's challenge to every player
+    is a dict lookup with no random selection or file checks.
+    """
+    def __init__(self, schedule: DailySchedule, video_manager: VideoManager,
+                 game_settings: Dict[str, Any], max_entries: int = 32):
+        self.schedule = schedule
+        self.video_manager = video_manager
+        self.game_settings = game_settings
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[date, Tuple[Dict[str, Any], bytes, str]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _render(self, day: date) -> Optional[Tuple[Dict[str, Any], bytes, str]]:
+        goal_id = self.schedule.goal_id_for(day)
+        goal = self.video_manager.get_goal_by_id(goal_id) if goal_id is not None else None
+        if goal is None:
+            return None
+        video = self.video_manager.get_game_video(goal)
+        payload = {
+            "date": day.isoformat(),
+            "challenge_number": self.schedule.challenge_number(day),
+            "goal_id": goal["id"],
+            "video_url": video["video_url"],
+            "video_type": "blurred",
+            "next_challenge_at": day_start(day + timedelta(days=1)).isoformat(),
+            **self.game_settings
+        }
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = f'"daily-{hashlib.sha1(body).hexdigest()[:16]}"'
+        return payload, body, etag
+
+    def get(self, day: date) -> Optional[Tuple[Dict[str, Any], bytes, str]]:
+        """(payload, JSON body, ETag) for a day's challenge, or None if there is none"""
+        with self.lock:
+            entry = self.entries.get(day)
+            if entry is not None:
+                self.entries.move_to_end(day)
+                return entry
+        entry = self._render(day)
+        if entry is None or entry[0]["video_url"] is None:
+            return entry  # not kept, so a blurred video added later is picked up
+        with self.lock:
+            self.entries[day] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def cache_control(self, day: date, now: Optional[datetime] = None) -> str:
+        """Shared caches keep today's challenge until midnight UTC, past ones for a day"""
+        now = now or datetime.now(timezone.utc)
+        if day >= now.date():
+            seconds = int((day_start(day + timedelta(days=1)) - now).total_seconds())
+            return f"public, max-age={max(seconds, 0)}"
+        return "public, max-age=86400"
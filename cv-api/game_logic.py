@@ -1,16 +1,10 @@
 import json
 import random
 from typing import Dict, List, Any, Tuple, Optional
-from dataclasses import dataclass
 from video_manager import VideoManager
-
-@dataclass
-class ComparisonResult:
-    attribute: str
-    guess_value: str
-    target_value: str
-    status: str  # "exact", "partial", "none"
-    hint: str = ""
+from game_sessions import GameSession
+from player_attributes import ATTRIBUTES, PlayerAttributes
+from player_index import PlayerIndex
 
 class GoaldleGame:
     def __init__(self, players_db_path: str = "data/players_db.json"):
@@ -40,211 +34,159 @@ class GoaldleGame:
             "Ivory Coast": "Africa"
         }
         
-        self.target_player = None
-        self.current_goal = None
-        self.guesses = []
+        # Name lookups and autocomplete; results are positions in self.players,
+        # which is also what sessions store
+        self.player_index = PlayerIndex(self.players)
+        # Players as integer attribute vectors; guesses are compared in one pass
+        self.attributes = PlayerAttributes(self.players, self.team_leagues, self.country_continents)
+        
         self.max_guesses = 6
         
-    def start_new_game(self) -> Dict[str, Any]:
-        """Start a new game with a random target player and corresponding video"""
-        # Get a random goal
-        available_goals = self.video_manager.get_all_goals()
-        self.current_goal = random.choice(available_goals)
+    def start_new_game(self, session: GameSession, goal_index: Optional[int] = None) -> Dict[str, Any]:
+        """Start a new game in this session on the given goal (random if None) and its scorer"""
+        if goal_index is None:
+            goal_index = random.randrange(len(self.video_manager.goals_db))
+        goal = self.video_manager.goals_db[goal_index]
         
         # Find the corresponding player
-        target_player_name = self.current_goal["scorer"]
-        self.target_player = self.get_player_by_name(target_player_name)
+        target_player_name = goal["scorer"]
+        target_index = self.player_index.find(target_player_name)
         
-        if not self.target_player:
+        if target_index is None:
             raise ValueError(f"Player {target_player_name} not found in players database")
         
-        self.guesses = []
+        session.goal_index = goal_index
+        session.target_index = target_index
+        session.guessed = []
         
         return {
             "message": "New game started!",
             "max_guesses": self.max_guesses,
-            "attributes": ["name", "team", "position", "nationality", "age", "height"],
+            "attributes": list(ATTRIBUTES),
             "goal_info": {
-                "id": self.current_goal["id"],
-                "player_name": self.current_goal["scorer"]
+                "id": goal["id"],
+                "player_name": goal["scorer"]
             }
         }
     
-    def get_player_by_name(self, name: str) -> Dict[str, Any]:
-        """Find player by name (case-insensitive)"""
-        for player in self.players:
-            if player["name"].lower() == name.lower():
-                return player
-        return None
-    
-    def compare_age(self, guess_age: int, target_age: int) -> ComparisonResult:
-        """Compare ages with directional hints"""
-        if guess_age == target_age:
-            return ComparisonResult("age", str(guess_age), str(target_age), "exact")
-        elif abs(guess_age - target_age) <= 3:
-            direction = "higher" if target_age > guess_age else "lower"
-            return ComparisonResult("age", str(guess_age), str(target_age), "partial", f"Target is {direction}")
-        else:
-            direction = "much higher" if target_age > guess_age else "much lower"
-            return ComparisonResult("age", str(guess_age), str(target_age), "none", f"Target is {direction}")
+    def get_session_goal(self, session: GameSession) -> Optional[Dict[str, Any]]:
+        """The goal (video) of the session's current game"""
+        if session.goal_index is None:
+            return None
+        return self.video_manager.goals_db[session.goal_index]
     
-    def compare_height(self, guess_height: str, target_height: str) -> ComparisonResult:
-        """Compare heights with directional hints"""
-        guess_cm = int(guess_height.replace("cm", ""))
-        target_cm = int(target_height.replace("cm", ""))
-        
-        if guess_cm == target_cm:
-            return ComparisonResult("height", guess_height, target_height, "exact")
-        elif abs(guess_cm - target_cm) <= 5:
-            direction = "taller" if target_cm > guess_cm else "shorter"
-            return ComparisonResult("height", guess_height, target_height, "partial", f"Target is {direction}")
-        else:
-            direction = "much taller" if target_cm > guess_cm else "much shorter"
-            return ComparisonResult("height", guess_height, target_height, "none", f"Target is {direction}")
+    def get_session_target(self, session: GameSession) -> Optional[Dict[str, Any]]:
+        """The player to guess in the session's current game"""
+        if session.target_index is None:
+            return None
+        return self.players[session.target_index]
     
-    def compare_team(self, guess_team: str, target_team: str) -> ComparisonResult:
-        """Compare teams with league hints"""
-        if guess_team == target_team:
-            return ComparisonResult("team", guess_team, target_team, "exact")
-        
-        guess_league = self.team_leagues.get(guess_team, "Unknown")
-        target_league = self.team_leagues.get(target_team, "Unknown")
-        
-        if guess_league == target_league and guess_league != "Unknown":
-            return ComparisonResult("team", guess_team, target_team, "partial", f"Same league ({target_league})")
-        else:
-            return ComparisonResult("team", guess_team, target_team, "none")
+    def get_player_by_name(self, name: str) -> Dict[str, Any]:
+        """Find player by name (ignoring case and accents)"""
+        index = self.player_index.find(name)
+        return self.players[index] if index is not None else None
     
-    def compare_nationality(self, guess_country: str, target_country: str) -> ComparisonResult:
-        """Compare nationalities with continent hints"""
-        if guess_country == target_country:
-            return ComparisonResult("nationality", guess_country, target_country, "exact")
-        
-        guess_continent = self.country_continents.get(guess_country, "Unknown")
-        target_continent = self.country_continents.get(target_country, "Unknown")
-        
-        if guess_continent == target_continent and guess_continent != "Unknown":
-            return ComparisonResult("nationality", guess_country, target_country, "partial", f"Same continent ({target_continent})")
-        else:
-            return ComparisonResult("nationality", guess_country, target_country, "none")
+    def build_guess_result(self, guessed_index: int, target_index: int, guess_number: int,
+                           comparisons: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Compare a guessed player against the target"""
+        if comparisons is None:
+            comparisons = self.attributes.compare([guessed_index], target_index)[0]
+        return {
+            "player": self.players[guessed_index],
+            "comparisons": comparisons,
+            "guess_number": guess_number
+        }
     
-    def compare_position(self, guess_pos: str, target_pos: str) -> ComparisonResult:
-        """Compare positions with attacking/defensive hints"""
-        if guess_pos == target_pos:
-            return ComparisonResult("position", guess_pos, target_pos, "exact")
-        
-        attacking_positions = ["Forward", "Striker"]
-        defensive_positions = ["Defender", "Goalkeeper"]
-        midfield_positions = ["Midfielder"]
-        
-        guess_type = "attacking" if guess_pos in attacking_positions else \
-                    "defensive" if guess_pos in defensive_positions else "midfield"
-        target_type = "attacking" if target_pos in attacking_positions else \
-                     "defensive" if target_pos in defensive_positions else "midfield"
-        
-        if guess_type == target_type:
-            return ComparisonResult("position", guess_pos, target_pos, "partial", f"Same type ({target_type})")
-        else:
-            return ComparisonResult("position", guess_pos, target_pos, "none")
+    def get_guess_results(self, session: GameSession) -> List[Dict[str, Any]]:
+        """Rebuild the comparison rows of every guess made in this session"""
+        rows = self.attributes.compare(session.guessed, session.target_index)
+        return [
+            self.build_guess_result(index, session.target_index, number, comparisons)
+            for number, (index, comparisons) in enumerate(zip(session.guessed, rows), start=1)
+        ]
     
-    def make_guess(self, player_name: str) -> Dict[str, Any]:
+    def make_guess(self, session: GameSession, player_name: str) -> Dict[str, Any]:
         """Process a player guess and return comparison results"""
-        if len(self.guesses) >= self.max_guesses:
+        if len(session.guessed) >= self.max_guesses:
             return {"error": "Maximum guesses reached"}
         
-        if not self.target_player:
+        target_player = self.get_session_target(session)
+        if not target_player:
             return {"error": "No active game. Start a new game first."}
         
-        guessed_player = self.get_player_by_name(player_name)
-        if not guessed_player:
-            return {"error": f"Player '{player_name}' not found in database"}
+        # Tolerates typos; near misses come back with suggestions to pick from
+        guessed_index, suggestions = self.player_index.resolve(player_name)
+        if guessed_index is None:
+            return {
+                "error": f"Player '{player_name}' not found in database",
+                "suggestions": [self.players[i]["name"] for i in suggestions]
+            }
         
         # Check if already guessed
-        if any(guess["player"]["name"] == guessed_player["name"] for guess in self.guesses):
+        if guessed_index in session.guessed:
             return {"error": "Player already guessed"}
         
-        # Compare all attributes
-        comparisons = []
-        
-        # Name comparison
-        if guessed_player["name"] == self.target_player["name"]:
-            comparisons.append(ComparisonResult("name", guessed_player["name"], self.target_player["name"], "exact"))
-        else:
-            comparisons.append(ComparisonResult("name", guessed_player["name"], self.target_player["name"], "none"))
-        
-        # Other attributes
-        comparisons.append(self.compare_team(guessed_player["team"], self.target_player["team"]))
-        comparisons.append(self.compare_position(guessed_player["position"], self.target_player["position"]))
-        comparisons.append(self.compare_nationality(guessed_player["nationality"], self.target_player["nationality"]))
-        comparisons.append(self.compare_age(guessed_player["age"], self.target_player["age"]))
-        comparisons.append(self.compare_height(guessed_player["height"], self.target_player["height"]))
-        
         # Create guess result
-        guess_result = {
-            "player": guessed_player,
-            "comparisons": [
-                {
-                    "attribute": comp.attribute,
-                    "guess_value": comp.guess_value,
-                    "target_value": comp.target_value,
-                    "status": comp.status,
-                    "hint": comp.hint
-                } for comp in comparisons
-            ],
-            "guess_number": len(self.guesses) + 1
-        }
-        
-        self.guesses.append(guess_result)
+        guess_result = self.build_guess_result(guessed_index, session.target_index, len(session.guessed) + 1)
+        session.guessed.append(guessed_index)
         
         # Check if won
-        is_winner = guessed_player["name"] == self.target_player["name"]
-        game_over = is_winner or len(self.guesses) >= self.max_guesses
+        is_winner = guessed_index == session.target_index
+        game_over = is_winner or len(session.guessed) >= self.max_guesses
         
         result = {
             "guess_result": guess_result,
             "is_winner": is_winner,
             "game_over": game_over,
-            "guesses_remaining": self.max_guesses - len(self.guesses),
-            "total_guesses": len(self.guesses)
+            "guesses_remaining": self.max_guesses - len(session.guessed),
+            "total_guesses": len(session.guessed)
         }
         
         if game_over and not is_winner:
-            result["target_player"] = self.target_player
+            result["target_player"] = target_player
         
         return result
     
-    def get_game_state(self) -> Dict[str, Any]:
-        """Get current game state"""
+    def get_game_state(self, session: GameSession) -> Dict[str, Any]:
+        """Get the session's current game state"""
+        target_player = self.get_session_target(session)
+        out_of_guesses = len(session.guessed) >= self.max_guesses
         return {
-            "has_active_game": self.target_player is not None,
-            "guesses": self.guesses,
-            "guesses_remaining": self.max_guesses - len(self.guesses) if self.target_player else 0,
-            "game_over": len(self.guesses) >= self.max_guesses if self.target_player else False,
-            "target_revealed": len(self.guesses) >= self.max_guesses and self.target_player,
-            "target_player": self.target_player if len(self.guesses) >= self.max_guesses else None
+            "has_active_game": target_player is not None,
+            "guesses": self.get_guess_results(session) if target_player else [],
+            "guesses_remaining": self.max_guesses - len(session.guessed) if target_player else 0,
+            "game_over": out_of_guesses if target_player else False,
+            "target_revealed": out_of_guesses and target_player,
+            "target_player": target_player if out_of_guesses else None
         }
     
     def get_available_players(self) -> List[str]:
-        """Get list of all player names for autocomplete"""
-        return [player["name"] for player in self.players]
+        """Get list of all player names (built once at load)"""
+        return self.player_index.names
+    
+    def search_players(self, query: str, limit: int = 10) -> List[str]:
+        """Player names matching a typed prefix, for autocomplete"""
+        return [self.players[i]["name"] for i in self.player_index.search(query, limit)]
     
-    def get_current_video(self) -> Optional[Dict[str, Any]]:
+    def get_current_video(self, session: GameSession) -> Optional[Dict[str, Any]]:
         """Get the current goal's blurred video for gameplay"""
-        if not self.current_goal:
+        goal = self.get_session_goal(session)
+        if not goal:
             return None
         
-        return self.video_manager.get_game_video(self.current_goal)
+        return self.video_manager.get_game_video(goal)
     
-    def get_video_reveal(self) -> Optional[Dict[str, Any]]:
+    def get_video_reveal(self, session: GameSession) -> Optional[Dict[str, Any]]:
         """Get both blurred and original videos for reveal"""
-        if not self.current_goal:
+        goal = self.get_session_goal(session)
+        if not goal:
             return None
             
-        video_pair = self.video_manager.get_video_pair(self.current_goal)
+        video_pair = self.video_manager.get_video_pair(goal)
         return {
             "goal_info": {
-                "id": self.current_goal["id"],
-                "player_name": self.current_goal["scorer"]
+                "id": goal["id"],
+                "player_name": goal["scorer"]
             },
             "videos": video_pair
         }
\ No newline at end of file
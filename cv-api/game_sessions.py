@@ -0,0 +1,283 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class GameSession:
+    """Compact per-player game state.
+
+    Only indexes are stored (goal and player positions in the loaded
+    databases); comparison rows are rebuilt from them when needed.
+    """
+    __slots__ = ("session_id", "goal_index", "target_index", "guessed", "last_seen")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.goal_index: Optional[int] = None
+        self.target_index: Optional[int] = None
+        self.guessed: List[int] = []
+        self.last_seen = time.time()
+
+    @property
+    def has_game(self) -> bool:
+        return self.target_index is not None
+
+
+class SessionStore(ABC):
+    """Storage interface for game sessions.
+
+    get() returns a live session (or None if unknown/expired) and counts
+    as activity for expiry. Callers that change a session must pass it to
+    save() so backends that don't hand out shared objects persist it.
+    """
+    backend = "none"
+
+    def __init__(self, ttl_seconds: float = 6 * 60 * 60, max_sessions: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @abstractmethod
+    def get(self, session_id: Optional[str]) -> Optional[GameSession]:
+        ...
+
+    @abstractmethod
+    def create(self) -> GameSession:
+        ...
+
+    @abstractmethod
+    def save(self, session: GameSession):
+        ...
+
+    def get_or_create(self, session_id: Optional[str]) -> GameSession:
+        return self.get(session_id) or self.create()
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def close(self):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "active_sessions": self.count(),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """Session-id keyed store with TTL expiry and a size cap, in process memory.
+
+    Sessions live in an OrderedDict ordered by last access, so lookup is
+    O(1) and both expired and least recently used sessions are always at
+    the front: expiry and cap eviction only ever look at the oldest entries.
+    Sessions are shared objects, so save() has nothing to do.
+    """
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float = 6 * 60 * 60, max_sessions: int = 50000):
+        super().__init__(ttl_seconds, max_sessions)
+        self.sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+
+    def _expire(self, now: float):
+        cutoff = now - self.ttl_seconds
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if oldest.last_seen >= cutoff:
+                break
+            del self.sessions[oldest.session_id]
+            self.expired += 1
+
+    def get(self, session_id: Optional[str]) -> Optional[GameSession]:
+        """Look up a live session and mark it as used"""
+        if not session_id:
+            return None
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.last_seen = now
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def create(self) -> GameSession:
+        """Start a new session, evicting the least recently used one if at the cap"""
+        session = GameSession(secrets.token_urlsafe(16))
+        with self.lock:
+            self._expire(session.last_seen)
+            while len(self.sessions) >= self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evicted += 1
+            self.sessions[session.session_id] = session
+            self.created += 1
+        return session
+
+    def save(self, session: GameSession):
+        pass
+
+    def count(self) -> int:
+        with self.lock:
+            return len(self.sessions)
+
+
+# SQL is kept in constants so sqlite3's statement cache reuses the prepared statements
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    goal_index INTEGER,
+    target_index INTEGER,
+    guessed TEXT NOT NULL DEFAULT '',
+    last_seen REAL NOT NULL
+) WITHOUT ROWID
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)"
+_SELECT = "SELECT goal_index, target_index, guessed, last_seen FROM sessions WHERE session_id = ?"
+_UPSERT = "INSERT OR REPLACE INTO sessions (session_id, goal_index, target_index, guessed, last_seen) VALUES (?, ?, ?, ?, ?)"
+_TOUCH = "UPDATE sessions SET last_seen = MAX(last_seen, ?) WHERE session_id = ?"
+_EXPIRE = "DELETE FROM sessions WHERE last_seen < ?"
+_COUNT = "SELECT COUNT(*) FROM sessions"
+_EVICT = "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM sessions ORDER BY last_seen LIMIT ?)"
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite database, shared by every worker process.
+
+    The database runs in WAL mode so readers in other uvicorn workers
+    never block on a writer. Game changes (save/create) are written
+    immediately, since the next request may land on another worker; the
+    much more frequent last-seen updates from get() are buffered and
+    written in one transaction every flush_every touches or
+    flush_interval seconds. Expiry and the size cap are enforced by a
+    sweep every sweep_interval seconds rather than on each request.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str = "data/sessions.db", ttl_seconds: float = 6 * 60 * 60,
+                 max_sessions: int = 50000, flush_every: int = 256, flush_interval: float = 1.0,
+                 sweep_interval: float = 60.0):
+        super().__init__(ttl_seconds, max_sessions)
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self.pending: Dict[str, float] = {}  # session_id -> last_seen not yet written
+        self.last_flush = self.last_sweep = time.time()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Autocommit mode; batches use explicit transactions
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute(_SCHEMA)
+        self.conn.execute(_INDEX)
+
+    def _flush(self, now: float):
+        """Write buffered last-seen updates in a single transaction (caller holds the lock)"""
+        self.last_flush = now
+        if not self.pending:
+            return
+        updates = [(last_seen, session_id) for session_id, last_seen in self.pending.items()]
+        self.pending.clear()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(_TOUCH, updates)
+
+    def _sweep(self, now: float):
+        """Delete expired sessions and the least recently used ones over the cap (caller holds the lock)"""
+        self._flush(now)
+        self.last_sweep = now
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.expired += self.conn.execute(_EXPIRE, (now - self.ttl_seconds,)).rowcount
+            excess = self.conn.execute(_COUNT).fetchone()[0] - self.max_sessions
+            if excess > 0:
+                self.evicted += self.conn.execute(_EVICT, (excess,)).rowcount
+
+    def _maintain(self, now: float):
+        if now - self.last_sweep >= self.sweep_interval:
+            self._sweep(now)
+        elif now - self.last_flush >= self.flush_interval or len(self.pending) >= self.flush_every:
+            self._flush(now)
+
+    def _write(self, session: GameSession):
+        self.pending.pop(session.session_id, None)
+        self.conn.execute(_UPSERT, (session.session_id, session.goal_index, session.target_index,
+                                    ",".join(map(str, session.guessed)), session.last_seen))
+
+    def get(self, session_id: Optional[str]) -> Optional[GameSession]:
+        """Load a live session and record the access (written with the next batch)"""
+        if not session_id:
+            return None
+        now = time.time()
+        with self.lock:
+            self._maintain(now)
+            row = self.conn.execute(_SELECT, (session_id,)).fetchone()
+            if row is None:
+                return None
+            goal_index, target_index, guessed, last_seen = row
+            if max(last_seen, self.pending.get(session_id, 0.0)) < now - self.ttl_seconds:
+                return None  # expired; removed by the next sweep
+            self.pending[session_id] = now
+
+        session = GameSession(session_id)
+        session.goal_index = goal_index
+        session.target_index = target_index
+        session.guessed = [int(index) for index in guessed.split(",")] if guessed else []
+        session.last_seen = now
+        return session
+
+    def create(self) -> GameSession:
+        session = GameSession(secrets.token_urlsafe(16))
+        with self.lock:
+            self._maintain(session.last_seen)
+            self._write(session)
+            self.created += 1
+        return session
+
+    def save(self, session: GameSession):
+        """Persist a changed session right away so other workers see it"""
+        session.last_seen = time.time()
+        with self.lock:
+            self._write(session)
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute(_COUNT).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self._flush(time.time())
+            self.conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["path"] = self.path
+        stats["pending_writes"] = len(self.pending)
+        return stats
+
+
+def create_session_store(backend: str = "memory", **kwargs) -> SessionStore:
+    """Build a session store by backend name ("memory" or "sqlite")"""
+    if backend == "memory":
+        kwargs.pop("path", None)
+        return MemorySessionStore(**kwargs)
+    if backend == "sqlite":
+        return SQLiteSessionStore(**kwargs)
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -0,0 +1,271 @@
+# Segmentation model backends: ultralytics/PyTorch, or an exported ONNX model on ONNX Runtime
+import glob
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Protocol
+
+import cv2
+import numpy as np
+
+# Defaults of the ultralytics predictor, mirrored by OnnxBackend
+NMS_IOU = 0.7
+MAX_DETECTIONS = 300
+PAD_VALUE = 114
+
+# Frames sampled from goals/*.mp4 to calibrate int8 quantization
+CALIBRATION_FRAMES = 64
+
+
+def letterbox(mask_shape, frame_shape):
+    """(left, top, width, height) of the frame inside a mask at the model's letterboxed input size.
+
+    The model sees the frame scaled to fit, centered and padded to a
+    multiple of the stride (ultralytics LetterBox); masks come at that size.
+    """
+    (mh, mw), (h, w) = mask_shape, frame_shape[:2]
+    ratio = min(mw / w, mh / h)
+    width, height = min(round(w * ratio), mw), min(round(h * ratio), mh)
+    return round((mw - width) / 2 - 0.1), round((mh - height) / 2 - 0.1), width, height
+
+
+@dataclass
+class Detections:
+    """Person detections of one frame as whole arrays.
+
+    boxes (N, 4) are xyxy in pixels of the image given to the model,
+    scores (N,) their confidences, and masks (N, H, W) the instance masks
+    at the letterboxed input size (see letterbox), above 0.5 inside.
+    """
+    boxes: np.ndarray
+    scores: np.ndarray
+    masks: np.ndarray
+
+    @classmethod
+    def empty(cls, mask_shape=(0, 0)):
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros((0, *mask_shape), np.uint8))
+
+    def __len__(self):
+        return len(self.boxes)
+
+
+class InferenceBackend(Protocol):
+    """Runs the segmentation model on a list of BGR frames (TorchBackend, OnnxBackend)"""
+    name: str
+
+    def predict(self, frames: List[np.ndarray], conf: float, imgsz: Optional[int] = None) -> List[Detections]:
+        """One Detections per frame, persons scoring above conf only.
+
+        imgsz is the model's input size (long side); None uses the backend's default.
+        """
+        ...
+
+
+class TorchBackend:
+    """The ultralytics YOLO model on PyTorch"""
+    name = "torch"
+
+    def __init__(self, model_path, threads=None):
+        # Imported here so torch/ultralytics only load along with the model
+        import torch
+        from ultralytics import YOLO
+        if threads:
+            torch.set_num_threads(threads)
+        self.yolo = YOLO(model_path)
+
+    def predict(self, frames, conf, imgsz=None):
+        size = {} if imgsz is None else {"imgsz": imgsz}
+        results = self.yolo(frames, classes=[0], verbose=False, conf=conf, **size)
+        detections = []
+        for result in results:
+            if result.boxes is None or result.masks is None or len(result.boxes) == 0:
+                detections.append(Detections.empty())
+                continue
+            # One device-to-host copy per array, not per box
+            detections.append(Detections(result.boxes.xyxy.cpu().numpy(),
+                                         result.boxes.conf.cpu().numpy(),
+                                         result.masks.data.cpu().numpy()))
+        return detections
+
+
+def nms(boxes, scores, iou_threshold, max_count):
+    """Indices of the boxes kept by greedy non-maximum suppression, best first"""
+    order = np.argsort(-scores, kind="stable")
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while len(order) and len(keep) < max_count:
+        best, order = order[0], order[1:]
+        keep.append(best)
+        top_left = np.maximum(boxes[best, :2], boxes[order, :2])
+        bottom_right = np.minimum(boxes[best, 2:], boxes[order, 2:])
+        overlap = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+        order = order[overlap / (areas[best] + areas[order] - overlap + 1e-7) <= iou_threshold]
+    return np.array(keep, dtype=np.intp)
+
+
+class OnnxBackend:
+    """A YOLOv8-seg model exported to ONNX (fixed input size), on ONNX Runtime's CPU provider.
+
+    Letterboxing, NMS and mask assembly follow the ultralytics predictor,
+    in NumPy, so its detections match TorchBackend's up to numerical noise.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path, threads=None):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_size = tuple(model_input.shape[2:])  # (h, w)
+
+    def preprocess(self, frame):
+        """frame letterboxed to the model input (ultralytics LetterBox), as a 1x3xHxW RGB float tensor"""
+        ih, iw = self.input_size
+        left, top, width, height = letterbox(self.input_size, frame.shape)
+        if (width, height) != (frame.shape[1], frame.shape[0]):
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+        image = cv2.copyMakeBorder(frame, top, ih - height - top, left, iw - width - left,
+                                   cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3)
+        return cv2.dnn.blobFromImage(image, 1 / 255, swapRB=True)
+
+    def postprocess(self, prediction, protos, frame_shape, conf):
+        """Detections from the raw outputs for one frame: (4 + classes + 32, anchors) and (32, mh, mw)"""
+        ih, iw = self.input_size
+        coefficients = protos.shape[0]
+        rows = prediction.T
+        classes = rows[:, 4:-coefficients]
+        best = classes.argmax(axis=1)
+        scores = classes[np.arange(len(rows)), best]
+        rows, scores = rows[(best == 0) & (scores > conf)], scores[(best == 0) & (scores > conf)]
+        if len(rows) == 0:
+            return Detections.empty((ih, iw))
+
+        cx, cy, w, h = rows[:, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        keep = nms(boxes, scores, NMS_IOU, MAX_DETECTIONS)
+        boxes, scores, weights = boxes[keep], scores[keep], rows[keep, -coefficients:]
+
+        # Mask logits upsampled to the input size (cv2 and torch bilinear agree), then cut to
+        # each box: pixel x is inside if x1 <= x < x2, i.e. from ceil(x1) to ceil(x2)
+        mh, mw = protos.shape[1:]
+        logits = (weights @ protos.reshape(coefficients, -1)).reshape(-1, mh, mw)
+        edges = np.clip(np.ceil(boxes), 0, [iw, ih, iw, ih]).astype(int)
+        masks, filled = [], np.zeros(len(boxes), bool)
+        for n, (logit, (x1, y1, x2, y2)) in enumerate(zip(logits, edges)):
+            inside = cv2.resize(logit, (iw, ih), interpolation=cv2.INTER_LINEAR)[y1:y2, x1:x2] > 0
+            # Like the ultralytics predictor, drop detections whose mask came out empty
+            if inside.any():
+                mask = np.zeros((ih, iw), np.uint8)
+                mask[y1:y2, x1:x2] = inside
+                masks.append(mask)
+                filled[n] = True
+        if not masks:
+            return Detections.empty((ih, iw))
+
+        # Boxes back to frame pixels (ultralytics scale_boxes)
+        left, top, width, height = letterbox(self.input_size, frame_shape)
+        fh, fw = frame_shape[:2]
+        gain = np.array([width / fw, height / fh] * 2)
+        boxes = (boxes - [left, top, left, top]) / gain
+        boxes = np.clip(boxes, 0, [fw, fh, fw, fh]).astype(np.float32)
+        return Detections(boxes[filled], scores[filled].astype(np.float32), np.stack(masks))
+
+    def predict(self, frames, conf, imgsz=None):
+        detections = []
+        for frame in frames:
+            prediction, protos = self.session.run(None, {self.input_name: self.preprocess(frame)})
+            detections.append(self.postprocess(prediction[0], protos[0], frame.shape, conf))
+        return detections
+
+
+def onnx_model_path(model_path, imgsz, int8=False):
+    """Where the ONNX export of model_path at input size imgsz is kept"""
+    stem = os.path.splitext(model_path)[0]
+    return f"{stem}-{imgsz}{'-int8' if int8 else ''}.onnx"
+
+
+class CalibrationFrames:
+    """Calibration data reader (get_next/rewind) over frames sampled from the goal clips"""
+    def __init__(self, backend, clips, count):
+        self.inputs = []
+        per_clip = max(count // max(len(clips), 1), 1)
+        for clip in clips:
+            cap = cv2.VideoCapture(clip)
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or per_clip
+            for index in np.linspace(0, total - 1, per_clip).astype(int):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ret, frame = cap.read()
+                if ret:
+                    self.inputs.append({backend.input_name: backend.preprocess(frame)})
+            cap.release()
+        self.remaining = iter(self.inputs)
+
+    def get_next(self):
+        return next(self.remaining, None)
+
+    def rewind(self):
+        self.remaining = iter(self.inputs)
+
+
+def head_decode_nodes(onnx_path):
+    """Names of the nodes decoding the Detect head's outputs (DFL, box math, final concat).
+
+    They mix pixel coordinates with 0-1 scores in one tensor, which uint8
+    can't hold, so they stay in float when the model is quantized.
+    """
+    import onnx
+    graph = onnx.load(onnx_path).graph
+    producer = next(node for node in graph.node if graph.output[0].name in node.output)
+    head = producer.name.rsplit("/", 1)[0] + "/"
+    branches = tuple(head + branch for branch in ("cv2.", "cv3.", "cv4.", "proto/"))
+    return [node.name for node in graph.node if node.name.startswith(head) and not node.name.startswith(branches)]
+
+
+def export_onnx(model_path, imgsz=640, int8=False, calibration_clips="goals/*.mp4"):
+    """Export model_path to ONNX at a fixed imgsz x imgsz input (and quantize it to int8); returns the path.
+
+    int8 models are quantized statically (QDQ, per-channel weights) on
+    frames from calibration_clips; without clips, dynamic quantization is
+    used. The head's decoding stays in float either way.
+    """
+    path = onnx_model_path(model_path, imgsz, int8)
+    if os.path.exists(path):
+        return path
+    if int8:
+        from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+        fp32_path = export_onnx(model_path, imgsz)
+        clips = sorted(glob.glob(calibration_clips))
+        print(f"🔧 Quantizing {fp32_path} to int8 ({len(clips)} calibration clips)...")
+        temp_path = f"{path}.tmp"
+        exclude = head_decode_nodes(fp32_path)
+        if clips:
+            reader = CalibrationFrames(OnnxBackend(fp32_path), clips, CALIBRATION_FRAMES)
+            quantize_static(fp32_path, temp_path, reader, quant_format=QuantFormat.QDQ, per_channel=True,
+                            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                            nodes_to_exclude=exclude)
+        else:
+            quantize_dynamic(fp32_path, temp_path, weight_type=QuantType.QUInt8, nodes_to_exclude=exclude)
+        os.replace(temp_path, path)
+        return path
+
+    from ultralytics import YOLO
+    print(f"🔧 Exporting {model_path} to ONNX at {imgsz}x{imgsz}...")
+    exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=False, verbose=False)
+    os.replace(exported, path)
+    return path
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def create_backend(name, model_path, imgsz=None, threads=None) -> InferenceBackend:
+    """The named backend for model_path; ONNX models are exported (once) at input size imgsz (default 640)"""
+    if name == "torch":
+        return TorchBackend(model_path, threads)
+    if name in ("onnx", "onnx-int8"):
+        backend = OnnxBackend(export_onnx(model_path, imgsz or 640, int8=name == "onnx-int8"), threads)
+        backend.name = name
+        return backend
+    raise ValueError(f"Unknown inference backend {name!r} (expected one of {', '.join(BACKENDS)})")
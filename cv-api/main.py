@@ -1,336 +1,142 @@
 # Goaldle CV API - Hybrid Approach (Best of Both)
+import importlib.util
 import subprocess
 import sys
 import os
+import threading
+
+# Module -> pip package
+REQUIRED_PACKAGES = {
+    "cv2": "opencv-python", "ultralytics": "ultralytics", "torch": "torch", "fastapi": "fastapi",
+    "uvicorn": "uvicorn", "multipart": "python-multipart", "scipy": "scipy"
+}
 
 # install dependencies
 def install_deps():
-    try:
-        import cv2
-        import ultralytics
-        import mediapipe
-        import torch
-        import fastapi
-        import scipy
+    # find_spec only looks the modules up, so checking doesn't import torch & co.
+    missing = [package for module, package in REQUIRED_PACKAGES.items() if importlib.util.find_spec(module) is None]
+    if not missing:
         print("✅ All dependencies already installed")
-    except ImportError:
-        print("📦 Installing dependencies...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", 
-                             "opencv-python", "ultralytics", "mediapipe", 
-                             "torch", "fastapi", "uvicorn", "python-multipart", "scipy"])
+        return
+    print("📦 Installing dependencies...")
+    subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
 
-install_deps()
+# Only when run as a script; importing the app (uvicorn main:app) never shells out to pip
+if __name__ == "__main__":
+    install_deps()
 
 # import everything
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel
-import cv2
-import numpy as np
+import asyncio
 import base64
-import tempfile
-from datetime import datetime
-from ultralytics import YOLO
-from collections import defaultdict
-from scipy.optimize import linear_sum_assignment
+from datetime import date, datetime
+from email.utils import formatdate
+from typing import Optional
+from daily_challenge import DailyChallenges, DailySchedule, day_start, utc_today
 from game_logic import GoaldleGame
+from player_attributes import ATTRIBUTES
+from game_sessions import GameSession, create_session_store
+from video_cache import ProcessedVideoCache
+from video_streaming import is_not_modified, video_response
+from video_jobs import VideoJobManager
 
 # create app and add cors
 app = FastAPI(title="GoalDle CV API", version="1.0")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], allow_credentials=False)
 
-class HybridGoaldleCV:
-    def __init__(self):
-        # Use medium model for better accuracy (you can switch back to 'yolov8n-seg.pt' if too slow)
-        self.yolo = YOLO('yolov8n-seg.pt')  # Use smaller model to avoid GitHub file size limits  
-        self.tracks = {}
-        self.next_id = 0
-        self.max_disappeared = 30  # Your good parameter
-        self.min_confidence = 0.3  # Your parameter - keeps more detections
-        self.max_distance = 150    # Your parameter - more lenient matching
-        self.min_iou = 0.1        # Your parameter
-        
-    def get_simple_features(self, bbox, mask, frame):
-        """Simplified feature extraction - faster than full histogram"""
-        x1, y1, x2, y2 = bbox
-        
-        # Basic features
-        centroid = ((x1 + x2) // 2, (y1 + y2) // 2)
-        area = (x2 - x1) * (y2 - y1)
-        aspect_ratio = (x2 - x1) / max(y2 - y1, 1)
-        
-        # Simple color feature - just average color in bbox
-        roi = frame[y1:y2, x1:x2]
-        if roi.size > 0:
-            avg_color = np.mean(roi.reshape(-1, 3), axis=0)
-        else:
-            avg_color = np.array([0, 0, 0])
-        
-        return {
-            'centroid': centroid,
-            'area': area,
-            'aspect_ratio': aspect_ratio,
-            'avg_color': avg_color,
-            'bbox': bbox
-        }
-    
-    def calculate_similarity(self, det_features, track_features):
-        """Lightweight similarity calculation"""
-        # Distance check first (early exit)
-        cent_dist = np.sqrt((det_features['centroid'][0] - track_features['centroid'][0])**2 + 
-                           (det_features['centroid'][1] - track_features['centroid'][1])**2)
-        
-        if cent_dist > self.max_distance:
-            return 0  # Too far apart
-        
-        # IoU check
-        iou = self.iou(det_features['bbox'], track_features['bbox'])
-        if iou < self.min_iou:
-            return 0  # Not enough overlap
-        
-        # Area similarity
-        area_ratio = min(det_features['area'], track_features['area']) / max(det_features['area'], track_features['area'])
-        
-        # Color similarity (simple Euclidean distance)
-        color_dist = np.linalg.norm(det_features['avg_color'] - track_features['avg_color'])
-        color_sim = max(0, 1 - color_dist / 100)  # Normalize to 0-1
-        
-        # Combined score
-        similarity = (
-            (1 / (1 + cent_dist/50)) * 0.5 +  # Distance (most important)
-            iou * 0.3 +                        # Overlap
-            area_ratio * 0.1 +                 # Size consistency
-            color_sim * 0.1                    # Color consistency
-        )
-        
-        return similarity
-    
-    def detect_and_track(self, frame):
-        # YOLOv8 detection with your parameters
-        results = self.yolo(frame, classes=[0], verbose=False, conf=self.min_confidence)
-        detections = []
-        
-        for result in results:
-            if result.boxes is not None and result.masks is not None:
-                for i, (box, mask) in enumerate(zip(result.boxes, result.masks)):
-                    x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-                    conf = float(box.conf[0].cpu().numpy())
-                    
-                    # Basic size filtering
-                    bbox_area = (x2 - x1) * (y2 - y1)
-                    if bbox_area > 500:  # Minimum reasonable size
-                        mask_data = mask.data[0].cpu().numpy()
-                        features = self.get_simple_features((x1, y1, x2, y2), mask_data, frame)
-                        detections.append((x1, y1, x2, y2, conf, mask_data, features))
-        
-        # Use Hungarian algorithm for assignment (prevents blinking)
-        if len(detections) > 0 and len(self.tracks) > 0:
-            current_tracks = self.assign_with_hungarian(detections)
-        else:
-            # Initialize tracks for first frame or when no existing tracks
-            current_tracks = self.initialize_tracks(detections)
-        
-        # Clean up old tracks
-        self.cleanup_tracks(current_tracks)
-        
-        return current_tracks
-    
-    def assign_with_hungarian(self, detections):
-        """Hungarian algorithm assignment"""
-        track_ids = [tid for tid, track in self.tracks.items() if track['frames'] < self.max_disappeared]
-        
-        if not track_ids:
-            return self.initialize_tracks(detections)
-        
-        # Build similarity matrix
-        similarity_matrix = np.zeros((len(detections), len(track_ids)))
-        
-        for i, det in enumerate(detections):
-            features = det[6]
-            for j, track_id in enumerate(track_ids):
-                similarity = self.calculate_similarity(features, self.tracks[track_id]['features'])
-                similarity_matrix[i, j] = similarity
-        
-        # Hungarian assignment (maximize similarity)
-        if similarity_matrix.size > 0:
-            row_indices, col_indices = linear_sum_assignment(-similarity_matrix)
-        else:
-            row_indices, col_indices = [], []
-        
-        # Process assignments
-        current_tracks = []
-        assigned_detections = set()
-        assigned_tracks = set()
-        
-        for row, col in zip(row_indices, col_indices):
-            if similarity_matrix[row, col] > 0.2:  # Minimum threshold
-                det = detections[row]
-                track_id = track_ids[col]
-                x1, y1, x2, y2, conf, mask, features = det
-                
-                # Update track
-                self.tracks[track_id]['features'] = features
-                self.tracks[track_id]['frames'] = 0
-                
-                current_tracks.append((x1, y1, x2, y2, track_id, mask))
-                assigned_detections.add(row)
-                assigned_tracks.add(track_id)
-        
-        # Create new tracks for unassigned detections
-        for i, det in enumerate(detections):
-            if i not in assigned_detections:
-                x1, y1, x2, y2, conf, mask, features = det
-                track_id = self.next_id
-                self.next_id += 1
-                
-                self.tracks[track_id] = {
-                    'features': features,
-                    'frames': 0
-                }
-                
-                current_tracks.append((x1, y1, x2, y2, track_id, mask))
-        
-        # Update frames for unassigned tracks
-        for track_id in track_ids:
-            if track_id not in assigned_tracks:
-                self.tracks[track_id]['frames'] += 1
-        
-        return current_tracks
-    
-    def initialize_tracks(self, detections):
-        """Initialize tracks for first frame"""
-        current_tracks = []
-        for det in detections:
-            x1, y1, x2, y2, conf, mask, features = det
-            track_id = self.next_id
-            self.next_id += 1
-            
-            self.tracks[track_id] = {
-                'features': features,
-                'frames': 0
-            }
-            
-            current_tracks.append((x1, y1, x2, y2, track_id, mask))
-        
-        return current_tracks
-    
-    def cleanup_tracks(self, current_tracks):
-        """Remove old tracks"""
-        tracks_to_remove = []
-        for track_id in list(self.tracks.keys()):
-            if self.tracks[track_id]['frames'] > self.max_disappeared:
-                tracks_to_remove.append(track_id)
-        
-        for track_id in tracks_to_remove:
-            del self.tracks[track_id]
-    
-    def iou(self, bbox1, bbox2):
-        """Your IoU function"""
-        x1_1, y1_1, x2_1, y2_1 = bbox1
-        x1_2, y1_2, x2_2, y2_2 = bbox2
-        
-        x1_i = max(x1_1, x1_2)
-        y1_i = max(y1_1, y1_2)
-        x2_i = min(x2_1, x2_2)
-        y2_i = min(y2_1, y2_2)
-        
-        if x2_i <= x1_i or y2_i <= y1_i:
-            return 0.0
-        
-        intersection = (x2_i - x1_i) * (y2_i - y1_i)
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union = area1 + area2 - intersection
-        
-        return intersection / union if union > 0 else 0.0
-    
-    def blur_players(self, frame, tracks):
-        """Your improved mask processing"""
-        result = frame.copy()
-        h, w = frame.shape[:2]
-        
-        for x1, y1, x2, y2, track_id, mask in tracks:
-            # Resize mask to frame size if needed
-            if mask.shape != (h, w):
-                mask_resized = cv2.resize(mask, (w, h), interpolation=cv2.INTER_NEAREST)
-            else:
-                mask_resized = mask
-            
-            # Your tight mask processing
-            binary_mask = (mask_resized > 0.5).astype(np.uint8)  # Higher threshold
-            
-            # Minimal morphological operations
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-            binary_mask = cv2.morphologyEx(binary_mask, cv2.MORPH_CLOSE, kernel)
-            
-            # Light smoothing
-            binary_mask = cv2.GaussianBlur(binary_mask.astype(np.float32), (3, 3), 0)
-            binary_mask = (binary_mask > 0.5).astype(np.uint8)
-            
-            # Apply black silhouette
-            result[binary_mask == 1] = [0, 0, 0]
-        
-        return result
-    
-    def process_video(self, video_bytes):
-        try:
-            # Save video
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as f:
-                f.write(video_bytes)
-                temp_path = f.name
-            
-            cap = cv2.VideoCapture(temp_path)
-            if not cap.isOpened():
-                raise ValueError("Could not open video")
-            
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            output_path = temp_path.replace('.mp4', '_blurred.mp4')
-            fourcc = cv2.VideoWriter_fourcc(*'H264')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            
-            frame_count = 0
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Process frame
-                tracks = self.detect_and_track(frame)
-                processed_frame = self.blur_players(frame, tracks)
-                out.write(processed_frame)
-                
-                frame_count += 1
-                if frame_count % 30 == 0:
-                    active_tracks = len([t for t in self.tracks.values() if t['frames'] < 5])
-                    print(f"Processed {frame_count} frames - Active tracks: {active_tracks}")
-            
-            cap.release()
-            out.release()
-            
-            # Read result
-            with open(output_path, 'rb') as f:
-                result_bytes = f.read()
-            
-            # Cleanup
-            os.unlink(temp_path)
-            os.unlink(output_path)
-            
-            return {
-                "success": True,
-                "blurred_video": base64.b64encode(result_bytes).decode(),
-                "video_info": {"fps": fps, "width": width, "height": height, "frames": frame_count}
-            }
-            
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-
 # Initialize CV and Game instances
-cv = HybridGoaldleCV()
 game = GoaldleGame()
+# Every player gets their own game, identified by a session id (cookie or header).
+# The sqlite backend keeps games across restarts and shares them between uvicorn workers.
+sessions = create_session_store(os.environ.get("GAME_SESSION_BACKEND", "memory"),
+                                path=os.environ.get("GAME_SESSION_DB", "data/sessions.db"),
+                                ttl_seconds=float(os.environ.get("GAME_SESSION_TTL", 6 * 60 * 60)),
+                                max_sessions=int(os.environ.get("GAME_MAX_SESSIONS", "50000")))
+# Goal of the day: same seeded schedule on every server, one rendered response per date
+daily = DailyChallenges(DailySchedule([goal["id"] for goal in game.video_manager.goals_db],
+                                      seed=os.environ.get("DAILY_SEED", "goaldle")),
+                        game.video_manager, {"max_guesses": game.max_guesses, "attributes": list(ATTRIBUTES)})
+video_cache = ProcessedVideoCache()
+# Video processing runs in worker processes (each loads the model once), so
+# the event loop keeps serving game requests while clips are processed
+job_manager = VideoJobManager(video_cache, max_workers=int(os.environ.get("CV_WORKERS", "1")))
+
+def cv_params():
+    """Cache-key parameters of the CV pipeline (cv_processor is imported on first use, not at startup)"""
+    from cv_processor import HybridGoaldleCV
+    return HybridGoaldleCV.cache_params()
+
+def warm_up_cv():
+    cv_params()
+    job_manager.warm_up()
+
+@app.on_event("startup")
+def startup():
+    # The game API doesn't need the CV stack; load it in the background (CV_WARMUP=0: on first use)
+    if os.environ.get("CV_WARMUP", "1") != "0":
+        threading.Thread(target=warm_up_cv, daemon=True).start()
+
+@app.on_event("shutdown")
+def shutdown():
+    job_manager.shutdown()
+    sessions.close()
+
+async def process_upload(contents):
+    """Process a video on the worker pool and wait for it without blocking the event loop"""
+    # Hashing the upload (and starting the pool on first use) would block the loop too
+    job = await asyncio.to_thread(job_manager.submit, contents, await asyncio.to_thread(cv_params))
+    await job_manager.wait(job)
+    if job.status != "done":
+        return {"success": False, "error": job.error}
+    
+    result = await asyncio.to_thread(job_manager.read_result, job)
+    if result is None:
+        return {"success": False, "error": "Processed video is no longer cached"}
+    blurred_video = await asyncio.to_thread(lambda: base64.b64encode(result).decode())
+    return {
+        "success": True,
+        "blurred_video": blurred_video,
+        "video_info": job.video_info,
+        "cached": job.cached
+    }
+
+SESSION_COOKIE = "goaldle_session"
+SESSION_HEADER = "x-session-id"
+
+def get_session_id(request):
+    """Session id from the X-Session-Id header, falling back to the cookie"""
+    return request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+
+def get_session(request):
+    """The caller's session, or an empty unsaved one (no active game) if unknown or expired"""
+    return sessions.get(get_session_id(request)) or GameSession(None)
+
+def session_response(content, session):
+    """JSON response carrying the session id in the body and as a cookie"""
+    response = JSONResponse(content={**content, "session_id": session.session_id})
+    response.set_cookie(SESSION_COOKIE, session.session_id, max_age=int(sessions.ttl_seconds),
+                        httponly=True, samesite="lax")
+    return response
+
+def get_daily(day_param):
+    """Parse a date query parameter (default today, UTC) and look up that day's challenge"""
+    today = utc_today()
+    if not day_param or day_param == "today":
+        day = today
+    else:
+        try:
+            day = date.fromisoformat(day_param)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Date must be YYYY-MM-DD")
+        if day > today:
+            raise HTTPException(status_code=404, detail="That challenge isn't out yet")
+    entry = daily.get(day)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No challenge for that date")
+    return day, entry
 
 # Pydantic models for API
 class GuessRequest(BaseModel):
@@ -342,52 +148,136 @@ async def root():
     return {"message": "GoalDle CV API - Hybrid Approach", "status": "ready"}
 
 
+@app.get("/ready")
+async def ready(cv: bool = False):
+    """Game API readiness and model load state; with ?cv=true, 503 until the model is loaded"""
+    readiness = {"game": "ready", "cv": job_manager.get_readiness()}
+    if cv and readiness["cv"]["state"] != "ready":
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
+
+
 @app.post("/process-video")
 async def process_video(file: UploadFile = File(...)):
     if not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="Must be video file")
     
     contents = await file.read()
-    result = cv.process_video(contents)
+    result = await process_upload(contents)
     return JSONResponse(content=result)
 
-@app.post("/reset-tracking")
-async def reset_tracking():
-    """Reset tracking state for new video"""
-    global cv
-    cv = HybridGoaldleCV()
-    return {"message": "Tracking reset successfully"}
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    """Queue a video for processing and return its job id right away"""
+    if not file.content_type.startswith("video/"):
+        raise HTTPException(status_code=400, detail="Must be video file")
+    
+    contents = await file.read()
+    job = await asyncio.to_thread(job_manager.submit, contents, await asyncio.to_thread(cv_params))
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/stats")
+async def get_job_stats():
+    """Worker pool size and job counts by status"""
+    return job_manager.get_stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a processing job"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
-# Game endpoints
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Blurred video of a finished job (video/mp4)"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Video processing failed: {job.error}")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.result is not None:
+        return Response(content=job.result, media_type="video/mp4")
+    # Streamed from the processed video cache rather than held in memory
+    path = job_manager.result_path(job)
+    if path is None:
+        raise HTTPException(status_code=410, detail="Processed video is no longer cached; submit it again")
+    return FileResponse(path, media_type="video/mp4")
+
+def cache_stats():
+    return {
+        "processed_videos": video_cache.get_stats(),
+        "video_files": game.video_manager.cache.get_stats(),
+        "guess_comparisons": game.attributes.get_stats()
+    }
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters and sizes of the processed video, video file and guess comparison caches"""
+    return cache_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """CV pipeline stage timings and counters, cache hits and job counts in Prometheus text format"""
+    return Response(content=job_manager.metrics_text(cache_stats()), media_type="text/plain; version=0.0.4")
+
+@app.api_route("/videos/{goal_id}/{kind}", methods=["GET", "HEAD"])
+def get_video_file(goal_id: str, kind: str, request: Request):
+    """Stream a goal's blurred or original video (a plain function: cache misses read the file from disk)"""
+    if kind not in ("blurred", "original"):
+        raise HTTPException(status_code=404, detail="Unknown video type")
+    
+    goal = game.video_manager.get_goal_by_id(goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    
+    return video_response(request, game.video_manager, game.video_manager.get_video_path(goal, kind))
+
+# Game endpoints. Those touching sessions are plain functions: FastAPI runs them in its
+# thread pool, so the SQLite session store's queries and commits don't block the event loop
 @app.post("/game/new")
-async def new_game():
+def new_game(request: Request):
     """Start a new Goaldle game"""
     try:
-        result = game.start_new_game()
-        return JSONResponse(content=result)
+        session = sessions.get_or_create(get_session_id(request))
+        result = game.start_new_game(session)
+        sessions.save(session)
+        return session_response(result, session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/game/guess")
-async def make_guess(request: GuessRequest):
+def make_guess(guess: GuessRequest, request: Request):
     """Make a guess in the current game"""
     try:
-        result = game.make_guess(request.player_name)
+        session = get_session(request)
+        result = game.make_guess(session, guess.player_name)
         if "error" in result:
-            raise HTTPException(status_code=400, detail=result["error"])
+            # Returned rather than raised so the 400 isn't turned into a 500 below
+            return JSONResponse(status_code=400, content={"detail": result["error"],
+                                                          "suggestions": result.get("suggestions", [])})
+        sessions.save(session)
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/game/state")
-async def get_game_state():
+def get_game_state(request: Request):
     """Get current game state"""
     try:
-        result = game.get_game_state()
+        result = game.get_game_state(get_session(request))
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/game/sessions/stats")
+def get_session_stats():
+    """Number of live game sessions and expiry/eviction counters"""
+    return sessions.get_stats()
+
 @app.get("/game/players")
 async def get_players():
     """Get list of all available players for autocomplete"""
@@ -397,11 +287,16 @@ async def get_players():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/game/players/search")
+async def search_players(q: str = "", limit: int = Query(10, ge=1, le=50)):
+    """Players whose name (or surname) starts with q, ignoring case and accents"""
+    return {"query": q, "players": game.search_players(q, limit)}
+
 @app.get("/game/current-video")
-async def get_current_video():
-    """Get the current game's video (blurred version)"""
+def get_current_video(request: Request):
+    """Get the current game's video URL (blurred version)"""
     try:
-        video_data = game.get_current_video()
+        video_data = game.get_current_video(get_session(request))
         if not video_data:
             raise HTTPException(status_code=404, detail="No active game or video not found")
         
@@ -413,10 +308,10 @@ async def get_current_video():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/game/video-reveal")
-async def get_video_reveal():
-    """Get both original and blurred videos for reveal"""
+def get_video_reveal(request: Request):
+    """Get URLs of both original and blurred videos for reveal"""
     try:
-        reveal_data = game.get_video_reveal()
+        reveal_data = game.get_video_reveal(get_session(request))
         if not reveal_data:
             raise HTTPException(status_code=404, detail="No active game")
         
@@ -427,29 +322,62 @@ async def get_video_reveal():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/game/daily")
+async def get_daily_challenge(request: Request, day: Optional[str] = Query(None, alias="date")):
+    """Today's (or a past day's) challenge: goal id and blurred video URL, cacheable until the next one"""
+    day, (payload, body, etag) = get_daily(day)
+    last_modified = day_start(day).timestamp()
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        # Don't let shared caches keep a challenge whose video isn't ready yet
+        "Cache-Control": daily.cache_control(day) if payload["video_url"] else "no-cache"
+    }
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.post("/game/daily/start")
+def start_daily_challenge(request: Request, day: Optional[str] = Query(None, alias="date")):
+    """Start this session's game on a day's challenge"""
+    day, (payload, _, _) = get_daily(day)
+    try:
+        session = sessions.get_or_create(get_session_id(request))
+        game_result = game.start_new_game(session, game.video_manager.goal_positions[payload["goal_id"]])
+        sessions.save(session)
+        return session_response({
+            "success": True,
+            "game_state": game_result,
+            "daily": payload
+        }, session)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/game/start-with-video")
-async def start_game_with_video():
+def start_game_with_video(request: Request):
     """Start a new game and get the video"""
     try:
         # Start new game
-        game_result = game.start_new_game()
+        session = sessions.get_or_create(get_session_id(request))
+        game_result = game.start_new_game(session)
+        sessions.save(session)
         
         # Get the video for this game
-        video_data = game.get_current_video()
+        video_data = game.get_current_video(session)
         
         if not video_data:
             raise HTTPException(status_code=500, detail="Failed to load video for game")
         
-        return JSONResponse(content={
+        return session_response({
             "success": True,
             "game_state": game_result,
             "video_data": video_data
-        })
+        }, session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/game/integrate-video")
-async def integrate_video_with_game(file: UploadFile = File(...)):
+async def integrate_video_with_game(request: Request, file: UploadFile = File(...)):
     """Process video, blur players, and start a new game (legacy endpoint)"""
     try:
         if not file.content_type.startswith("video/"):
@@ -457,15 +385,17 @@ async def integrate_video_with_game(file: UploadFile = File(...)):
         
         # Process the video
         contents = await file.read()
-        video_result = cv.process_video(contents)
+        video_result = await process_upload(contents)
         
         if not video_result["success"]:
             raise HTTPException(status_code=500, detail=f"Video processing failed: {video_result['error']}")
         
         # Start a new game
-        game_result = game.start_new_game()
+        session = await asyncio.to_thread(sessions.get_or_create, get_session_id(request))
+        game_result = game.start_new_game(session)
+        await asyncio.to_thread(sessions.save, session)
         
-        return JSONResponse(content={
+        return session_response({
             "success": True,
             "video_result": {
                 "blurred_video": video_result["blurred_video"],
@@ -473,7 +403,7 @@ async def integrate_video_with_game(file: UploadFile = File(...)):
             },
             "game_state": game_result,
             "hint": "Watch the blurred video and guess which player is performing the goal!"
-        })
+        }, session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
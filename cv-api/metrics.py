@@ -0,0 +1,163 @@
+# Per-stage timings and counters of the CV pipeline, rendered in Prometheus text format.
+# Pure Python (no cv2/numpy) so the API can import it without the CV stack.
+import json
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Pipeline stages timed for every frame
+STAGES = ("decode", "inference", "features", "assignment", "compositing", "encode")
+
+# Histogram upper bounds: seconds per frame and stage, detections/tracks per frame, seconds per clip
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 15, 20, 30, 50, 100)
+CLIP_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Counter names and their descriptions
+COUNTERS = {
+    "clips": "Clips processed",
+    "frames": "Frames processed",
+    "keyframes": "Frames that went through segmentation",
+    "detections": "Detections kept after the size filter",
+    "tracks_created": "Tracks started",
+    "tracks_evicted": "Tracks dropped, unmatched for max_disappeared frames or at a camera cut",
+    "shot_cuts": "Camera cuts detected"
+}
+
+
+class Histogram:
+    """Prometheus-style histogram: observation counts per bucket (last one +Inf), sum and count"""
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, data: Dict[str, Any]):
+        """Add the observations of another histogram's as_dict()"""
+        if tuple(data["buckets"]) != self.buckets:
+            raise ValueError("Histogram buckets differ")
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.sum += data["sum"]
+        self.count += data["count"]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+class PipelineMetrics:
+    """Stage timings and counters of one clip, or of every clip merged into it.
+
+    Each stage histogram is only written by one thread (decode and encode
+    run on the pipeline's threads, the rest on the processing thread).
+    With trace=True the stage times and counts of every frame are also
+    kept, for write_trace.
+    """
+    def __init__(self, trace: bool = False):
+        self.stages = {stage: Histogram(STAGE_BUCKETS) for stage in STAGES}
+        self.detections = Histogram(COUNT_BUCKETS)  # per segmented frame
+        self.tracks = Histogram(COUNT_BUCKETS)      # silhouettes drawn per frame
+        self.clip_seconds = Histogram(CLIP_BUCKETS)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.trace: Optional[Dict[int, Dict[str, Any]]] = {} if trace else None
+
+    def observe(self, stage: str, seconds: float, frame: Optional[int] = None):
+        self.stages[stage].observe(seconds)
+        if self.trace is not None and frame is not None:
+            self.trace.setdefault(frame, {})[stage] = seconds
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def note(self, frame: int, **values):
+        """Record per-frame values (detections, tracks, ...) in the trace, if tracing"""
+        if self.trace is not None:
+            self.trace.setdefault(frame, {}).update(values)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-able snapshot (goes in video_info and across processes); see merge"""
+        return {
+            "stages": {stage: histogram.as_dict() for stage, histogram in self.stages.items()},
+            "detections": self.detections.as_dict(),
+            "tracks": self.tracks.as_dict(),
+            "clip_seconds": self.clip_seconds.as_dict(),
+            "counters": dict(self.counters)
+        }
+
+    def merge(self, data: Dict[str, Any]):
+        """Add another PipelineMetrics' as_dict() (e.g. a finished clip's) to this one"""
+        for stage, histogram in data["stages"].items():
+            self.stages[stage].merge(histogram)
+        self.detections.merge(data["detections"])
+        self.tracks.merge(data["tracks"])
+        self.clip_seconds.merge(data["clip_seconds"])
+        for name, value in data["counters"].items():
+            self.counters[name] += value
+
+    def summary(self) -> Dict[str, float]:
+        """Mean milliseconds per frame of each stage"""
+        return {stage: round(1000 * h.sum / h.count, 3) if h.count else 0.0 for stage, h in self.stages.items()}
+
+    def write_trace(self, path: str):
+        """Write the per-frame trace as JSON lines: frame, then stage seconds and counts"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for frame in sorted(self.trace or {}):
+                f.write(json.dumps({"frame": frame, **self.trace[frame]}) + "\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: Dict[str, Any]) -> List[str]:
+    lines, cumulative = [], 0
+    for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def render_prometheus(metrics: PipelineMetrics, caches: Dict[str, Dict[str, Any]],
+                      gauges: Iterable[Tuple[str, str, Dict[str, Any], float]] = ()) -> str:
+    """Prometheus text exposition of the pipeline metrics, cache hit/miss counters and extra gauges.
+
+    gauges are (name, help, labels, value); gauges sharing a name share one HELP/TYPE header.
+    """
+    lines = [
+        "# HELP goaldle_cv_stage_seconds Time spent on one frame in each pipeline stage",
+        "# TYPE goaldle_cv_stage_seconds histogram"
+    ]
+    for stage, histogram in metrics.stages.items():
+        lines += _histogram_lines("goaldle_cv_stage_seconds", histogram, {"stage": stage})
+    for name, histogram, text in (
+        ("goaldle_cv_detections_per_frame", metrics.detections, "Detections kept on each segmented frame"),
+        ("goaldle_cv_tracks_per_frame", metrics.tracks, "Silhouettes drawn on each frame"),
+        ("goaldle_cv_clip_seconds", metrics.clip_seconds, "Processing time of each clip")
+    ):
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} histogram"]
+        lines += _histogram_lines(name, histogram, {})
+    for counter, value in metrics.counters.items():
+        name = f"goaldle_cv_{counter}_total"
+        lines += [f"# HELP {name} {COUNTERS[counter]} since start",
+                  f"# TYPE {name} counter", f"{name} {value}"]
+
+    for field in ("hits", "misses"):
+        name = f"goaldle_cache_{field}_total"
+        lines += [f"# HELP {name} Cache {field} since start", f"# TYPE {name} counter"]
+        lines += [f"{name}{_labels({'cache': cache})} {stats[field]}" for cache, stats in caches.items()]
+
+    headers = set()
+    for name, text, labels, value in gauges:
+        if name not in headers:
+            headers.add(name)
+            lines += [f"# HELP {name} {text}", f"# TYPE {name} gauge"]
+        lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,168 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+# Column layout of PlayerAttributes.codes
+NAME, TEAM, LEAGUE, COUNTRY, CONTINENT, POSITION, POSITION_TYPE, AGE, HEIGHT = range(9)
+
+# Comparison status codes and their API names
+NONE, PARTIAL, EXACT = 0, 1, 2
+STATUS_NAMES = ("none", "partial", "exact")
+
+ATTRIBUTES = ("name", "team", "position", "nationality", "age", "height")
+
+ATTACKING_POSITIONS = ("Forward", "Striker")
+DEFENSIVE_POSITIONS = ("Defender", "Goalkeeper")
+POSITION_TYPES = ("attacking", "defensive", "midfield")
+
+AGE_CLOSE = 3     # years apart that still count as a partial match
+HEIGHT_CLOSE = 5  # cm apart that still count as a partial match
+
+
+def position_type(position: str) -> str:
+    if position in ATTACKING_POSITIONS:
+        return "attacking"
+    if position in DEFENSIVE_POSITIONS:
+        return "defensive"
+    return "midfield"
+
+
+class PlayerAttributes:
+    """Players encoded once as integer attribute vectors for guess comparisons.
+
+    Every categorical attribute (team, league, country, continent,
+    position, position type) becomes an id and height is parsed to cm, so
+    comparing a guess with the target is one pass of integer compares over
+    two tuples instead of per-attribute dict lookups and string parsing.
+    Leagues and continents missing from the mappings get id -1 and never
+    match. Built comparison rows are kept in an LRU per (guess, target)
+    pair, and display strings are shared rather than rebuilt.
+    """
+    def __init__(self, players: List[Dict[str, Any]], team_leagues: Dict[str, str],
+                 country_continents: Dict[str, str], max_cached_rows: int = 65536):
+        self.players = players
+        self.names = [player["name"] for player in players]
+        self.teams = [player["team"] for player in players]
+        self.countries = [player["nationality"] for player in players]
+        self.positions = [player["position"] for player in players]
+        self.ages = [str(player["age"]) for player in players]
+        self.heights = [player["height"] for player in players]
+        self.leagues = [team_leagues.get(team, "Unknown") for team in self.teams]
+        self.continents = [country_continents.get(country, "Unknown") for country in self.countries]
+        self.position_types = [position_type(position) for position in self.positions]
+
+        def ids(values, unknown=None):
+            table: Dict[str, int] = {}
+            return [-1 if value == unknown else table.setdefault(value, len(table)) for value in values]
+
+        # One tuple of ints per player; indexing tuples beats numpy for a handful of guesses
+        self.codes: List[Tuple[int, ...]] = list(zip(
+            ids(self.names),
+            ids(self.teams),
+            ids(self.leagues, unknown="Unknown"),
+            ids(self.countries),
+            ids(self.continents, unknown="Unknown"),
+            ids(self.positions),
+            [POSITION_TYPES.index(kind) for kind in self.position_types],
+            [int(player["age"]) for player in players],
+            [int(height.replace("cm", "")) for height in self.heights]
+        ))
+
+        self.max_cached_rows = max_cached_rows
+        self.rows: "OrderedDict[Tuple[int, int], List[Dict[str, str]]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def statuses(self, guess: int, target: int) -> Tuple[List[int], int, int]:
+        """Status codes (in ATTRIBUTES order) and target-minus-guess age and height"""
+        g = self.codes[guess]
+        t = self.codes[target]
+        age_diff = t[AGE] - g[AGE]
+        height_diff = t[HEIGHT] - g[HEIGHT]
+        return [
+            EXACT if g[NAME] == t[NAME] else NONE,
+            EXACT if g[TEAM] == t[TEAM] else PARTIAL if g[LEAGUE] == t[LEAGUE] >= 0 else NONE,
+            EXACT if g[POSITION] == t[POSITION] else PARTIAL if g[POSITION_TYPE] == t[POSITION_TYPE] else NONE,
+            EXACT if g[COUNTRY] == t[COUNTRY] else PARTIAL if g[CONTINENT] == t[CONTINENT] >= 0 else NONE,
+            EXACT if age_diff == 0 else PARTIAL if abs(age_diff) <= AGE_CLOSE else NONE,
+            EXACT if height_diff == 0 else PARTIAL if abs(height_diff) <= HEIGHT_CLOSE else NONE
+        ], age_diff, height_diff
+
+    def build_rows(self, guesses: List[int], target: int) -> List[List[Dict[str, str]]]:
+        """Comparison rows for several guesses against one target"""
+        rows = []
+        for guess in guesses:
+            codes, age_diff, height_diff = self.statuses(guess, target)
+            hints = [
+                "",
+                f"Same league ({self.leagues[target]})" if codes[1] == PARTIAL else "",
+                f"Same type ({self.position_types[target]})" if codes[2] == PARTIAL else "",
+                f"Same continent ({self.continents[target]})" if codes[3] == PARTIAL else "",
+                self.direction_hint(codes[4], age_diff, "higher", "lower"),
+                self.direction_hint(codes[5], height_diff, "taller", "shorter")
+            ]
+            values = (
+                (self.names[guess], self.names[target]),
+                (self.teams[guess], self.teams[target]),
+                (self.positions[guess], self.positions[target]),
+                (self.countries[guess], self.countries[target]),
+                (self.ages[guess], self.ages[target]),
+                (self.heights[guess], self.heights[target])
+            )
+            rows.append([
+                {
+                    "attribute": attribute,
+                    "guess_value": guess_value,
+                    "target_value": target_value,
+                    "status": STATUS_NAMES[code],
+                    "hint": hint
+                } for attribute, (guess_value, target_value), code, hint in zip(ATTRIBUTES, values, codes, hints)
+            ])
+        return rows
+
+    @staticmethod
+    def direction_hint(code: int, diff: int, up: str, down: str) -> str:
+        if code == EXACT:
+            return ""
+        direction = up if diff > 0 else down
+        return f"Target is {direction}" if code == PARTIAL else f"Target is much {direction}"
+
+    def compare(self, guesses: List[int], target: int) -> List[List[Dict[str, str]]]:
+        """Comparison rows for each guess against the target, served from the LRU where possible.
+
+        Rows are shared between callers and must not be modified.
+        """
+        rows: List[Any] = [None] * len(guesses)
+        missing = []
+        with self.lock:
+            for i, guess in enumerate(guesses):
+                row = self.rows.get((guess, target))
+                if row is None:
+                    missing.append(i)
+                else:
+                    self.rows.move_to_end((guess, target))
+                    rows[i] = row
+            self.hits += len(guesses) - len(missing)
+            self.misses += len(missing)
+        if not missing:
+            return rows
+
+        built = self.build_rows([guesses[i] for i in missing], target)
+        with self.lock:
+            for i, row in zip(missing, built):
+                rows[i] = row
+                if self.max_cached_rows > 0:
+                    self.rows[(guesses[i], target)] = row
+            while len(self.rows) > self.max_cached_rows:
+                self.rows.popitem(last=False)
+        return rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "cached_rows": len(self.rows),
+                "max_cached_rows": self.max_cached_rows,
+                "hits": self.hits,
+                "misses": self.misses
+            }
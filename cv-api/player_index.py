@@ -0,0 +1,270 @@
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Letters that don't decompose into base letter + accent under NFKD
+_FOLD = str.maketrans({
+    "ø": "o", "æ": "ae", "œ": "oe", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i",
+    "-": " ", "'": "", "’": "", ".": ""
+})
+
+
+def normalize_name(name: str) -> str:
+    """Fold case, accents and punctuation so 'Kanté', 'kante' and 'KANTE' match"""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.translate(_FOLD).split())
+
+
+def letter_counts(key: str) -> np.ndarray:
+    """How often each letter (a-z, space, anything else) occurs in a normalized name"""
+    counts = np.zeros(28, dtype=np.int16)
+    for ch in key:
+        code = ord(ch) - 97
+        counts[code if 0 <= code < 26 else (26 if ch == " " else 27)] += 1
+    return counts
+
+
+def trigrams(key: str) -> set:
+    """Distinct 3-grams of a normalized name, padded so word starts/ends count"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def pattern_masks(pattern: str) -> Dict[str, int]:
+    """Bit mask of the positions of each character in pattern"""
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def masked_edit_distance(masks: Dict[str, int], length: int, text: str, max_distance: int) -> Optional[int]:
+    """Edit distance from a pattern (given by pattern_masks) to text, or None if over max_distance.
+
+    Insertions, deletions, substitutions and swaps of adjacent letters
+    ('salha' -> 'salah') each count as one edit. Bit-parallel (Myers'
+    algorithm with Hyyro's transposition extension): one DP column per
+    text character in a handful of integer operations, stopping once the
+    distance can no longer come back under max_distance.
+    """
+    if abs(length - len(text)) > max_distance:
+        return None
+    if length == 0:
+        return len(text)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp, vn, d0, prev_eq = full, 0, 0, 0
+    score = length
+    remaining = len(text)
+    for ch in text:
+        eq = masks.get(ch, 0)
+        transposed = (((~d0) & eq) << 1) & prev_eq
+        d0 = ((((eq & vp) + vp) ^ vp) | eq | vn | transposed) & full
+        hp = (vn | ~(d0 | vp)) & full
+        hn = vp & d0
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        remaining -= 1
+        if score - remaining > max_distance:
+            return None
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = (hn | ~(d0 | hp)) & full
+        vn = hp & d0
+        prev_eq = eq
+    return score if score <= max_distance else None
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Edit distance between a and b (see masked_edit_distance), or None if over max_distance"""
+    return masked_edit_distance(pattern_masks(a), len(a), b, max_distance)
+
+
+class FuzzyNameMatcher:
+    """Typo-tolerant lookup of players by normalized name keys.
+
+    A trigram inverted index narrows the keys to those sharing enough
+    trigrams with the query (an edit touches at most 3 trigrams, so a key
+    within distance k shares at least |trigrams(query)| - 3k of them).
+    Those are filtered again by a letter-count bound (an edit changes at
+    most two letter counts by one, so half the L1 difference of the counts
+    is a lower bound on the distance), and only the survivors get a bounded
+    edit distance check. Both filters are vectorized over all candidates.
+    A player can own several keys (full name, surname); results are per
+    player.
+    """
+    max_distance = 3      # furthest edit distance considered a near miss
+    max_candidates = 64   # edit distance checks per query at most
+    auto_accept_distance = 1  # a unique match this close is taken as the player
+    min_similarity = 0.4  # trigram Dice score for suggestions beyond max_distance
+
+    def __init__(self, keys: List[str], owners: List[int]):
+        self.keys = keys
+        self.owners = owners
+        self.sizes = np.array([len(trigrams(key)) for key in keys], dtype=np.int32)
+        self.letters = np.array([letter_counts(key) for key in keys], dtype=np.int16).reshape(-1, 28)
+        postings = defaultdict(list)
+        for k, key in enumerate(keys):
+            for gram in trigrams(key):
+                postings[gram].append(k)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def overlap(self, grams: set) -> np.ndarray:
+        """Number of the query's trigrams each key shares"""
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return np.zeros(len(self.keys), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self.keys))
+
+    def _near(self, key: str, grams: set, counts: np.ndarray, limit: int) -> List[Tuple[int, int]]:
+        """Up to limit players with a key within max_distance edits, as (player, distance), closest first"""
+        max_distance = min(self.max_distance, max(1, len(key) // 4))
+
+        # Keys that could be within max_distance, checked in order of their
+        # lower bound on the distance, then most shared trigrams
+        possible = np.flatnonzero(counts >= len(grams) - 3 * max_distance)
+        letter_gap = np.abs(self.letters[possible] - letter_counts(key)).sum(axis=1)
+        lower = np.maximum((letter_gap + 1) // 2, (len(grams) - counts[possible] + 2) // 3)
+        keep = lower <= max_distance
+        possible, lower = possible[keep], lower[keep]
+        order = np.lexsort((-counts[possible], lower))[:self.max_candidates]
+        masks = pattern_masks(key)
+        near = []
+        for k, bound in zip(possible[order].tolist(), lower[order].tolist()):
+            if len(near) >= limit:
+                # Stop once nothing left can beat the limit-th best so far
+                near.sort()
+                if bound > near[limit - 1][0]:
+                    break
+            distance = masked_edit_distance(masks, len(key), self.keys[k], max_distance)
+            if distance is not None:
+                near.append((distance, -int(counts[k]), k))
+        near.sort()
+
+        ranked = []
+        seen = set()
+        for distance, _, k in near:
+            if len(ranked) < limit and self.owners[k] not in seen:
+                seen.add(self.owners[k])
+                ranked.append((self.owners[k], distance))
+        return ranked
+
+    def _similar(self, grams: set, counts: np.ndarray, exclude: set, limit: int) -> List[int]:
+        """Up to limit players whose keys look most alike by trigram Dice score"""
+        shared = np.flatnonzero(counts)
+        dice = 2 * counts[shared] / (len(grams) + self.sizes[shared])
+        # Only the best few are needed (players can repeat across their keys)
+        top = 4 * limit + len(exclude)
+        if len(dice) > top:
+            best = np.argpartition(-dice, top)[:top]
+            shared, dice = shared[best], dice[best]
+        similar = []
+        for pos in np.argsort(-dice, kind="stable"):
+            if len(similar) >= limit or dice[pos] < self.min_similarity:
+                break
+            owner = self.owners[int(shared[pos])]
+            if owner not in exclude and owner not in similar:
+                similar.append(owner)
+        return similar
+
+    def match(self, key: str, limit: int = 5) -> Tuple[Optional[int], List[int]]:
+        """Resolve a normalized name with typos to a player.
+
+        Returns (player, []) when exactly one player is within
+        auto_accept_distance edits and closer than any other, otherwise
+        (None, suggestions): players within max_distance edits (fewest
+        edits first), then players whose names only look similar.
+        """
+        grams = trigrams(key)
+        counts = self.overlap(grams)
+        near = self._near(key, grams, counts, max(limit, 2))
+        if near and near[0][1] <= self.auto_accept_distance:
+            if len(near) == 1 or near[1][1] > near[0][1]:
+                return near[0][0], []
+
+        suggestions = [player for player, _ in near[:limit]]
+        if len(suggestions) < limit:
+            suggestions += self._similar(grams, counts, set(suggestions), limit - len(suggestions))
+        return None, suggestions
+
+
+class PlayerIndex:
+    """Name lookups over the player database, built once at load.
+
+    An exact-match hash map on normalized names backs guessing, and two
+    sorted key arrays back prefix search for autocomplete: one of full
+    names and one of every later word onwards ('drogba' for 'Didier
+    Drogba'), so typing a surname finds the player too. A prefix search
+    is a binary search plus a scan of the matching run. Names that match
+    nothing exactly go through a FuzzyNameMatcher for typos.
+    """
+
+    def __init__(self, players: List[Dict[str, Any]]):
+        self.players = players
+        self.names = [player["name"] for player in players]
+        self.by_name: Dict[str, int] = {}
+        full_keys = []
+        word_keys = []
+        for i, name in enumerate(self.names):
+            key = normalize_name(name)
+            self.by_name.setdefault(key, i)
+            full_keys.append((key, i))
+            words = key.split()
+            for w in range(1, len(words)):
+                word_keys.append((" ".join(words[w:]), i))
+        full_keys.sort()
+        word_keys.sort()
+        self.full_keys = [key for key, _ in full_keys]
+        self.full_players = [i for _, i in full_keys]
+        self.word_keys = [key for key, _ in word_keys]
+        self.word_players = [i for _, i in word_keys]
+        # Typos are matched against full names and surnames alike
+        fuzzy_keys = full_keys + word_keys
+        self.fuzzy = FuzzyNameMatcher([key for key, _ in fuzzy_keys], [i for _, i in fuzzy_keys])
+
+    def find(self, name: str) -> Optional[int]:
+        """Index of the player with this name (ignoring case and accents), or None"""
+        return self.by_name.get(normalize_name(name))
+
+    def _scan(self, keys: List[str], players: List[int], prefix: str, found: List[int], limit: int):
+        start = bisect_left(keys, prefix)
+        for pos in range(start, len(keys)):
+            if len(found) >= limit or not keys[pos].startswith(prefix):
+                return
+            if players[pos] not in found:
+                found.append(players[pos])
+
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """Indexes of players whose name or a later part of it starts with query.
+
+        Full-name matches come first, then surname/later-word matches, each
+        in alphabetical order.
+        """
+        prefix = normalize_name(query)
+        if not prefix or limit <= 0:
+            return []
+        found: List[int] = []
+        self._scan(self.full_keys, self.full_players, prefix, found, limit)
+        self._scan(self.word_keys, self.word_players, prefix, found, limit)
+        return found
+
+    def resolve(self, name: str, limit: int = 5) -> Tuple[Optional[int], List[int]]:
+        """Match a typed name to a player, tolerating small typos.
+
+        Returns (index, []) for an exact match or a single close fuzzy match
+        ('Kylian Mbape', 'Son Heungmin'), otherwise (None, suggestions) with
+        the closest players first.
+        """
+        index = self.find(name)
+        if index is not None:
+            return index, []
+        key = normalize_name(name)
+        if not key:
+            return None, []
+        return self.fuzzy.match(key, limit)
@@ -0,0 +1,225 @@
+"""Blur every goal video in the goals database, in parallel, without the API.
+
+Run from cv-api/:  python process_videos.py [--workers N] [--batch-size 8] [--goal ID ...] [--force] [--dry-run]
+                                             [--backend torch|onnx|onnx-int8] [--trace DIR]
+
+Goals are processed by a pool of worker processes that each load the
+model once. A manifest (goals/blurred/manifest.json) records each output
+together with the source's size/mtime/hash and the processing parameters,
+so goals whose blurred video is already up to date are skipped. Outputs
+are written to a temp file and renamed into place, and goals_db.json and
+the manifest are rewritten (atomically) as each goal finishes, so an
+interrupted run keeps its progress.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from cv_processor import HybridGoaldleCV
+from inference_backends import BACKENDS, export_onnx
+from metrics import PipelineMetrics
+
+GOALS_DB_PATH = "data/goals_db.json"
+BLURRED_DIR = "goals/blurred"
+MANIFEST_PATH = os.path.join(BLURRED_DIR, "manifest.json")
+
+# Per worker process: the CV instance, loaded once
+_worker_cv = None
+
+
+def _init_worker(threads):
+    """Load the model once per worker, limiting its threads so workers don't oversubscribe the cores"""
+    global _worker_cv
+    import cv2
+    cv2.setNumThreads(threads)
+    _worker_cv = HybridGoaldleCV(threads=threads)
+
+
+def _blur_goal(source_path, output_path, batch_size, trace_path=None):
+    """Blur one video; the output only appears (atomically) once it is complete"""
+    directory, name = os.path.split(output_path)
+    temp_path = os.path.join(directory, f".{os.path.splitext(name)[0]}.{uuid.uuid4().hex}.tmp.mp4")
+    start = time.perf_counter()
+    try:
+        video_info = _worker_cv.blur_file(source_path, temp_path, batch_size, trace_path=trace_path)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+    video_info["seconds"] = round(time.perf_counter() - start, 2)
+    return video_info
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stamp(path):
+    """(size, mtime_ns) of a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_json_atomic(path, data):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def blurred_path_for(source_path):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(BLURRED_DIR, f"{name}_blurred.mp4")
+
+
+def is_up_to_date(entry, source_path, output_path, params):
+    """Whether a goal's recorded output is still valid; the source is hashed only if its size/mtime changed"""
+    if not entry or entry.get("params") != params or entry.get("output") != output_path:
+        return False
+    if file_stamp(output_path) != entry.get("output_stamp"):
+        return False
+    source_stamp = file_stamp(source_path)
+    if source_stamp == entry.get("source_stamp"):
+        return True
+    if source_stamp and source_stamp[0] == entry["source_stamp"][0] and file_sha256(source_path) == entry.get("source_sha256"):
+        entry["source_stamp"] = source_stamp  # touched but unchanged
+        return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blur every goal video in the goals database")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="worker processes, each with its own model (default: min(4, cores))")
+    parser.add_argument("--batch-size", type=int, default=None, help="frames per YOLO call")
+    parser.add_argument("--goal", action="append", dest="goal_ids", help="only this goal id (repeatable)")
+    parser.add_argument("--force", action="store_true", help="reprocess even if the output is up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only list what would be processed")
+    parser.add_argument("--db", default=GOALS_DB_PATH)
+    parser.add_argument("--trace", metavar="DIR", help="write a per-frame trace of each goal to DIR/<goal id>.jsonl")
+    parser.add_argument("--backend", choices=BACKENDS, default=HybridGoaldleCV.backend,
+                        help="inference backend (default: CV_BACKEND or torch)")
+    args = parser.parse_args()
+    # Spawned workers read the backend from the environment
+    os.environ["CV_BACKEND"] = HybridGoaldleCV.backend = args.backend
+
+    with open(args.db, 'r', encoding='utf-8') as f:
+        goals = json.load(f)
+    manifest = {}
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    os.makedirs(BLURRED_DIR, exist_ok=True)
+    params = HybridGoaldleCV.cache_params()
+
+    todo = []
+    skipped = failed = 0
+    db_changed = False
+    for goal in goals:
+        if args.goal_ids and goal["id"] not in args.goal_ids:
+            continue
+        source_path = goal["original_video"].replace("cv-api/", "")
+        output_path = blurred_path_for(source_path)
+        if not os.path.exists(source_path):
+            print(f"❌ Goal {goal['id']} ({goal['scorer']}): video not found: {source_path}")
+            failed += 1
+        elif not args.force and is_up_to_date(manifest.get(goal["id"]), source_path, output_path, params):
+            skipped += 1
+            if goal.get("blurred_video") != f"cv-api/{output_path}":
+                goal["blurred_video"] = f"cv-api/{output_path}"
+                db_changed = True
+        else:
+            todo.append((goal, source_path, output_path))
+
+    if db_changed and not args.dry_run:
+        write_json_atomic(args.db, goals)
+    print(f"{len(todo)} to process, {skipped} up to date, {failed} missing")
+    if args.dry_run:
+        for goal, source_path, output_path in todo:
+            print(f"  Goal {goal['id']} ({goal['scorer']}): {source_path} -> {output_path}")
+        return
+    if not todo:
+        return
+
+    # Longest videos first so the pool doesn't end waiting on one big straggler
+    todo.sort(key=lambda item: os.path.getsize(item[1]), reverse=True)
+    workers = max(1, min(args.workers, len(todo)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    if args.backend != "torch":
+        # Export the ONNX model once here rather than racing to in every worker
+        export_onnx(HybridGoaldleCV.model_name, HybridGoaldleCV.inference_size or 640,
+                    int8=args.backend == "onnx-int8")
+    print(f"🚀 Processing with {workers} worker(s), {threads} thread(s) each ({args.backend} backend)...")
+
+    if args.trace:
+        os.makedirs(args.trace, exist_ok=True)
+    start = time.perf_counter()
+    processed = frames = 0
+    totals = PipelineMetrics()
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(threads,)) as pool:
+        futures = {
+            pool.submit(_blur_goal, source_path, output_path, args.batch_size,
+                        os.path.join(args.trace, f"{goal['id']}.jsonl") if args.trace else None):
+                (goal, source_path, output_path)
+            for goal, source_path, output_path in todo
+        }
+        for future in as_completed(futures):
+            goal, source_path, output_path = futures[future]
+            try:
+                video_info = future.result()
+            except Exception as e:
+                print(f"❌ Goal {goal['id']} ({goal['scorer']}) failed: {e}")
+                failed += 1
+                continue
+
+            processed += 1
+            frames += video_info["frames"]
+            totals.merge(video_info["metrics"])
+            manifest[goal["id"]] = {
+                "source": source_path,
+                "source_stamp": file_stamp(source_path),
+                "source_sha256": file_sha256(source_path),
+                "output": output_path,
+                "output_stamp": file_stamp(output_path),
+                "params": params,
+                "frames": video_info["frames"],
+                "seconds": video_info["seconds"],
+                "processed_at": datetime.now(timezone.utc).isoformat()
+            }
+            write_json_atomic(MANIFEST_PATH, manifest)
+            if goal.get("blurred_video") != f"cv-api/{output_path}":
+                goal["blurred_video"] = f"cv-api/{output_path}"
+                write_json_atomic(args.db, goals)
+            print(f"✅ Goal {goal['id']} ({goal['scorer']}): {video_info['frames']} frames in {video_info['seconds']}s -> {output_path}")
+
+    wall = time.perf_counter() - start
+    print(f"\nProcessed {processed}, skipped {skipped}, failed {failed} in {wall:.1f}s"
+          f" ({frames / wall:.1f} frames/s overall)")
+    if processed:
+        stages = ", ".join(f"{stage} {ms}" for stage, ms in totals.summary().items())
+        print(f"Mean ms per frame: {stages}")
+        counters = totals.counters
+        print(f"{counters['keyframes']} keyframes, {counters['detections']} detections, "
+              f"{counters['tracks_created']} tracks created, {counters['tracks_evicted']} evicted, "
+              f"{counters['shot_cuts']} shot cuts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Frames are shrunk to this size before they are compared
+THUMBNAIL_SIZE = (64, 36)
+
+
+def thumbnails(frame):
+    """(BGR, float32 gray) thumbnails of a frame"""
+    small = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    return small, cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+
+def frame_signature(frame):
+    """(normalized hue/saturation histogram, gray thumbnail) of a downscaled frame"""
+    small, gray = thumbnails(frame)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+    return cv2.normalize(hist, hist, 1.0, 0.0, cv2.NORM_L1), gray
+
+
+class ShotBoundaryDetector:
+    """Spots camera cuts from one frame to the next.
+
+    Each frame is compared with the previous one on a 64x36 thumbnail in
+    two ways: the Bhattacharyya distance of their color histograms, and
+    the mean absolute difference of their gray levels (which catches cuts
+    between two shots of the same green pitch). A cut is either measure
+    above its threshold and also ratio times its recent average, so fast
+    pans and zooms, which change frames steadily, don't count. A new shot
+    must last min_shot_frames frames before another cut is reported.
+    """
+    def __init__(self, hist_threshold=0.4, gray_threshold=20.0, ratio=3.0, window=15, min_shot_frames=5):
+        self.thresholds = np.array([hist_threshold, gray_threshold])
+        self.ratio = ratio
+        self.min_shot_frames = min_shot_frames
+        self.recent = deque(maxlen=window)
+        self.previous = None
+        self.shot_frames = 0
+        self.thumbnail = None  # gray thumbnail of the last frame fed, reused by keyframe scheduling
+
+    def update(self, frame):
+        """Feed the next frame; True if it starts a new shot"""
+        hist, gray = frame_signature(frame)
+        cut = False
+        if self.previous is not None:
+            distances = np.array([
+                cv2.compareHist(self.previous[0], hist, cv2.HISTCMP_BHATTACHARYYA),
+                cv2.absdiff(self.previous[1], gray).mean()
+            ])
+            baseline = np.mean(self.recent, axis=0) if self.recent else np.zeros(2)
+            jumped = (distances > self.thresholds) & (distances > self.ratio * baseline)
+            cut = bool(jumped.any()) and self.shot_frames >= self.min_shot_frames
+            if cut:
+                self.recent.clear()
+            else:
+                self.recent.append(distances)
+        self.previous = (hist, gray)
+        self.thumbnail = gray
+        self.shot_frames = 0 if cut else self.shot_frames + 1
+        return cut
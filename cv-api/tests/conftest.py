@@ -0,0 +1,5 @@
+# The modules live flat in cv-api/; run from there:  python -m pytest -q tests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+import pytest
+
+import cv_processor
+from cv_processor import HybridGoaldleCV
+from inference_backends import Detections
+
+CLIP = "goals/drogba.mp4"  # camera cut at frame 124
+
+
+class OnePlayer:
+    """Backend that finds one player in the middle of every frame (masks at frame size)"""
+    name = "fake"
+
+    def predict(self, frames, conf, imgsz=None):
+        detections = []
+        for frame in frames:
+            h, w = frame.shape[:2]
+            box = np.array([[w // 2 - 60, h // 2 - 150, w // 2 + 60, h // 2 + 150]], np.float32)
+            mask = np.zeros((1, h, w), np.uint8)
+            mask[0, h // 2 - 150:h // 2 + 150, w // 2 - 60:w // 2 + 60] = 1
+            detections.append(Detections(box, np.ones(1, np.float32), mask))
+        return detections
+
+
+@pytest.fixture
+def cv(monkeypatch):
+    monkeypatch.setattr(cv_processor, "create_backend", lambda *args: OnePlayer())
+    return HybridGoaldleCV()
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(np.maximum(frame, 1))  # no source pixel is silhouette black
+    cap.release()
+    return frames
+
+
+def test_sessions_take_their_own_settings(cv):
+    keyframes = cv.new_session(keyframe_interval=3, inference_size=320)
+    default = cv.new_session()
+
+    assert (keyframes.keyframe_interval, keyframes.inference_size) == (3, 320)
+    assert (default.keyframe_interval, default.inference_size) == (cv.keyframe_interval, cv.inference_size)
+    with pytest.raises(TypeError):
+        cv.new_session(keyframe_intervall=3)
+
+
+def test_no_frame_after_a_cut_goes_out_unmasked(cv):
+    frames = read_frames(CLIP)
+    # Scheduled keyframes only, none of them on the cut
+    session = cv.new_session(trace=True, keyframe_interval=5, keyframe_change=None)
+    output = []
+    for start in range(0, len(frames), 8):
+        output += session.process_batch(frames[start:start + 8])
+
+    assert session.cuts and all(cut % 5 for cut in session.cuts)
+    h, w = output[0].shape[:2]
+    unmasked = [n for n, frame in enumerate(output) if frame[h // 2 - 100:h // 2 + 100, w // 2 - 40:w // 2 + 40].any()]
+    assert unmasked == []
+    assert all(session.metrics.trace[cut]["keyframe"] for cut in session.cuts)
@@ -0,0 +1,68 @@
+import asyncio
+import gc
+from concurrent.futures import Future
+
+from video_cache import ProcessedVideoCache
+from video_jobs import VideoJob, VideoJobManager
+
+PARAMS = {"model": "test"}
+
+
+def reachable(root):
+    """Every object reachable from root through references"""
+    seen, stack = set(), [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        yield obj
+        stack.extend(gc.get_referents(obj))
+
+
+def holds(job, data):
+    return any(obj is data for obj in reachable(job))
+
+
+def test_finished_job_drops_its_result(tmp_path):
+    manager = VideoJobManager(ProcessedVideoCache(str(tmp_path)))
+    blurred = b"blurred video" * 1000
+    job = VideoJob(id="job", cache_key=ProcessedVideoCache.make_key(b"upload", PARAMS))
+    job.future = Future()
+    manager.jobs[job.id] = job
+    job.future.add_done_callback(lambda future: manager._on_done(job, future))
+    job.future.set_result((blurred, {"frames": 3}))
+
+    assert job.status == "done"
+    assert job.future is None
+    assert not holds(job, blurred)
+    assert manager.read_result(job) == blurred
+    assert manager.result_path(job) is not None
+
+
+def test_cache_hit_keeps_no_result(tmp_path):
+    cache = ProcessedVideoCache(str(tmp_path))
+    blurred = b"blurred video" * 1000
+    cache.put(ProcessedVideoCache.make_key(b"upload", PARAMS), blurred, {"frames": 3})
+    manager = VideoJobManager(cache)
+
+    job = manager.submit(b"upload", PARAMS)
+
+    assert job.status == "done" and job.cached
+    assert manager.pool is None
+    assert job.result is None and job.future is None
+    assert manager.read_result(job) == blurred
+    assert asyncio.run(manager.wait(job)) is job
+
+
+def test_job_without_cache_keeps_result_in_memory():
+    manager = VideoJobManager(None)
+    blurred = b"blurred video"
+    job = VideoJob(id="job", cache_key="key")
+    job.future = Future()
+    job.future.add_done_callback(lambda future: manager._on_done(job, future))
+    job.future.set_result((blurred, {}))
+
+    assert job.future is None
+    assert job.result is blurred
+    assert manager.read_result(job) is blurred
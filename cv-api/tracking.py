@@ -0,0 +1,199 @@
+import numpy as np
+
+# Scores at or below this are not treated as a match by the Hungarian assignment
+MIN_MATCH_SIMILARITY = 0.2
+
+
+def iou(bbox1, bbox2):
+    """IoU of two (x1, y1, x2, y2) boxes"""
+    x1_1, y1_1, x2_1, y2_1 = bbox1
+    x1_2, y1_2, x2_2, y2_2 = bbox2
+
+    x1_i = max(x1_1, x1_2)
+    y1_i = max(y1_1, y1_2)
+    x2_i = min(x2_1, x2_2)
+    y2_i = min(y2_1, y2_2)
+
+    if x2_i <= x1_i or y2_i <= y1_i:
+        return 0.0
+
+    intersection = (x2_i - x1_i) * (y2_i - y1_i)
+    area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
+    area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
+    union = area1 + area2 - intersection
+
+    return intersection / union if union > 0 else 0.0
+
+
+def calculate_similarity(det_features, track_features, max_distance, min_iou):
+    """Scalar similarity between one detection and one track (reference path)"""
+    # Distance check first (early exit)
+    cent_dist = np.sqrt((det_features['centroid'][0] - track_features['centroid'][0])**2 +
+                       (det_features['centroid'][1] - track_features['centroid'][1])**2)
+
+    if cent_dist > max_distance:
+        return 0  # Too far apart
+
+    # IoU check
+    overlap = iou(det_features['bbox'], track_features['bbox'])
+    if overlap < min_iou:
+        return 0  # Not enough overlap
+
+    # Area similarity
+    area_ratio = min(det_features['area'], track_features['area']) / max(det_features['area'], track_features['area'])
+
+    # Color similarity (simple Euclidean distance)
+    color_dist = np.linalg.norm(det_features['avg_color'] - track_features['avg_color'])
+    color_sim = max(0, 1 - color_dist / 100)  # Normalize to 0-1
+
+    # Combined score
+    similarity = (
+        (1 / (1 + cent_dist/50)) * 0.5 +  # Distance (most important)
+        overlap * 0.3 +                    # Overlap
+        area_ratio * 0.1 +                 # Size consistency
+        color_sim * 0.1                    # Color consistency
+    )
+
+    return similarity
+
+
+def similarity_matrix(det_boxes, det_colors, track_boxes, track_colors, max_distance, min_iou):
+    """Detections x tracks similarity, same score and gating as calculate_similarity.
+
+    Boxes are (N, 4) integer arrays of x1, y1, x2, y2 and colors are (N, 3)
+    mean BGR values. Every term is computed for the whole matrix at once
+    with broadcasting instead of one Python call per pair.
+    """
+    det_boxes = np.asarray(det_boxes, dtype=np.int64)
+    track_boxes = np.asarray(track_boxes, dtype=np.int64)
+    if len(det_boxes) == 0 or len(track_boxes) == 0:
+        return np.zeros((len(det_boxes), len(track_boxes)))
+
+    d = det_boxes[:, None, :]
+    t = track_boxes[None, :, :]
+
+    # Centroid distance (integer centroids, as in calculate_similarity's features)
+    dcx = (d[..., 0] + d[..., 2]) // 2
+    dcy = (d[..., 1] + d[..., 3]) // 2
+    tcx = (t[..., 0] + t[..., 2]) // 2
+    tcy = (t[..., 1] + t[..., 3]) // 2
+    cent_dist = np.sqrt((dcx - tcx)**2 + (dcy - tcy)**2)
+
+    # IoU
+    det_area = (d[..., 2] - d[..., 0]) * (d[..., 3] - d[..., 1])
+    track_area = (t[..., 2] - t[..., 0]) * (t[..., 3] - t[..., 1])
+    inter_w = np.minimum(d[..., 2], t[..., 2]) - np.maximum(d[..., 0], t[..., 0])
+    inter_h = np.minimum(d[..., 3], t[..., 3]) - np.maximum(d[..., 1], t[..., 1])
+    intersection = np.where((inter_w > 0) & (inter_h > 0), inter_w * inter_h, 0)
+    union = det_area + track_area - intersection
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overlap = np.where(union > 0, intersection / union, 0.0)
+
+        # Area similarity
+        area_ratio = np.minimum(det_area, track_area) / np.maximum(det_area, track_area)
+
+    # Color similarity
+    color_diff = np.asarray(det_colors, dtype=np.float64)[:, None, :] - np.asarray(track_colors, dtype=np.float64)[None, :, :]
+    # Batched dot product, which accumulates like np.linalg.norm on a single vector
+    color_dist = np.sqrt((color_diff[..., None, :] @ color_diff[..., :, None])[..., 0, 0])
+    color_sim = np.maximum(0, 1 - color_dist / 100)
+
+    similarity = (
+        (1 / (1 + cent_dist/50)) * 0.5 +
+        overlap * 0.3 +
+        area_ratio * 0.1 +
+        color_sim * 0.1
+    )
+
+    # Same gates as the scalar path
+    gated = (cent_dist > max_distance) | (overlap < min_iou)
+    return np.where(gated, 0.0, similarity)
+
+
+class TrackTable:
+    """Struct-of-arrays track store with slot reuse.
+
+    Each track lives in a fixed slot of preallocated arrays (id, bbox, mean
+    color, frames since last match, bbox motion per frame). Evicted slots go on a free list and
+    are reused by new tracks, so memory stays flat on long clips with lots
+    of track churn. Capacity only grows (doubling) if more tracks are alive
+    at once than it can hold.
+    """
+    def __init__(self, capacity=256):
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.bboxes = np.zeros((capacity, 4), dtype=np.int64)
+        self.colors = np.zeros((capacity, 3), dtype=np.float64)
+        self.frames = np.zeros(capacity, dtype=np.int32)
+        self.velocities = np.zeros((capacity, 4), dtype=np.float64)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))  # pop() hands out low slots first
+
+    @property
+    def capacity(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def _grow(self):
+        old = self.capacity
+        self.ids = np.concatenate([self.ids, np.full(old, -1, dtype=np.int64)])
+        self.bboxes = np.concatenate([self.bboxes, np.zeros((old, 4), dtype=np.int64)])
+        self.colors = np.concatenate([self.colors, np.zeros((old, 3), dtype=np.float64)])
+        self.frames = np.concatenate([self.frames, np.zeros(old, dtype=np.int32)])
+        self.velocities = np.concatenate([self.velocities, np.zeros((old, 4), dtype=np.float64)])
+        self.live = np.concatenate([self.live, np.zeros(old, dtype=bool)])
+        self.free.extend(range(2 * old - 1, old - 1, -1))
+
+    def add(self, track_id, bbox, color):
+        """Store a new track and return its slot"""
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.ids[slot] = track_id
+        self.bboxes[slot] = bbox
+        self.colors[slot] = color
+        self.frames[slot] = 0
+        self.velocities[slot] = 0
+        self.live[slot] = True
+        return slot
+
+    def update(self, slots, bboxes, colors, elapsed=1):
+        """Refresh matched tracks with their new detections, elapsed frames after the last detection step"""
+        gap = self.frames[slots] + elapsed
+        self.velocities[slots] = (bboxes - self.bboxes[slots]) / gap[:, None]
+        self.bboxes[slots] = bboxes
+        self.colors[slots] = colors
+        self.frames[slots] = 0
+
+    def age(self, slots, elapsed=1):
+        """Count elapsed more frames without a match"""
+        self.frames[slots] += elapsed
+
+    def predicted(self, slots, elapsed=1):
+        """Bboxes extrapolated at constant velocity to elapsed frames after the last detection step"""
+        steps = self.frames[slots] + elapsed
+        return np.rint(self.bboxes[slots] + self.velocities[slots] * steps[:, None]).astype(np.int64)
+
+    def candidates(self, max_frames):
+        """Slots of live tracks seen within max_frames, oldest track id first"""
+        slots = np.flatnonzero(self.live & (self.frames < max_frames))
+        return slots[np.argsort(self.ids[slots], kind='stable')]
+
+    def count_active(self, max_frames):
+        return int(np.count_nonzero(self.live & (self.frames < max_frames)))
+
+    def evict(self, max_frames):
+        """Free every track unmatched for max_frames or more; returns the number evicted"""
+        stale = np.flatnonzero(self.live & (self.frames >= max_frames))
+        if len(stale):
+            self.live[stale] = False
+            self.ids[stale] = -1
+            self.free.extend(stale[::-1].tolist())
+        return len(stale)
+
+    def clear(self):
+        self.live[:] = False
+        self.ids[:] = -1
+        self.frames[:] = 0
+        self.free = list(range(self.capacity - 1, -1, -1))
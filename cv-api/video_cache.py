@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when the processing pipeline changes its output for the same parameters
+CACHE_VERSION = 1
+
+
+class ProcessedVideoCache:
+    """Disk-backed, size-bounded LRU cache of processed (blurred) videos.
+
+    Entries are keyed by a hash of the uploaded bytes plus the model and
+    tracker parameters, so the same clip processed with the same settings
+    is only run through the CV pipeline once. Each entry is a <key>.mp4
+    with the blurred video and a <key>.json with its video_info.
+    """
+    def __init__(self, cache_dir: str = "cache/processed", max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> entry size in bytes, least recently used first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._load_index()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return base + ".mp4", base + ".json"
+
+    def _load_index(self):
+        """Rebuild the LRU order from what is on disk (oldest mtime first)"""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp4"):
+                continue
+            key = name[:-4]
+            video_path, info_path = self._paths(key)
+            if not os.path.exists(info_path):
+                continue
+            size = os.path.getsize(video_path) + os.path.getsize(info_path)
+            found.append((os.path.getmtime(video_path), key, size))
+
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def make_key(video_bytes: bytes, params: Dict[str, Any]) -> str:
+        """Content hash of the video plus the parameters that affect the output"""
+        h = hashlib.sha256()
+        h.update(video_bytes)
+        h.update(json.dumps({"version": CACHE_VERSION, **params}, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Return (video_bytes, video_info) for a cached entry, or None"""
+        return self._read(key, with_video=True)
+
+    def get_info(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the video_info of a cached entry (counted like get), without reading the video"""
+        entry = self._read(key, with_video=False)
+        return entry[1] if entry else None
+
+    def video_path(self, key: str) -> Optional[str]:
+        """Path of a cached entry's video, or None (not counted as a lookup)"""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        return self._paths(key)[0]
+
+    def _read(self, key: str, with_video: bool) -> Optional[Tuple[Optional[bytes], Dict[str, Any]]]:
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+
+        video_path, info_path = self._paths(key)
+        video_bytes = None
+        try:
+            if with_video:
+                with open(video_path, 'rb') as f:
+                    video_bytes = f.read()
+            with open(info_path, 'r', encoding='utf-8') as f:
+                video_info = json.load(f)
+            os.utime(video_path)  # keep LRU order across restarts
+        except (OSError, ValueError):
+            # Entry vanished or is corrupt - drop it and treat as a miss
+            with self.lock:
+                self._remove(key)
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return video_bytes, video_info
+
+    def put(self, key: str, video_bytes: bytes, video_info: Dict[str, Any]) -> bool:
+        """Store a processed video, evicting least recently used entries to fit; False if it is too big"""
+        info_bytes = json.dumps(video_info).encode()
+        size = len(video_bytes) + len(info_bytes)
+        if size > self.max_bytes:
+            return False
+
+        video_path, info_path = self._paths(key)
+        # Write to temp files then rename so readers never see partial entries
+        for path, data in ((info_path, info_bytes), (video_path, video_bytes)):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+            self.entries[key] = size
+            self.total_bytes += size
+            self._evict()
+        return True
+
+    def _remove(self, key: str):
+        self.total_bytes -= self.entries.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,314 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from metrics import PipelineMetrics, render_prometheus
+from video_cache import ProcessedVideoCache
+
+# Per worker process: the CV instance (model loaded once) and the progress channel
+_worker_cv = None
+_progress_queue = None
+_load_seconds = 0.0
+
+
+def _init_worker(progress_queue):
+    """Load the segmentation model once when a worker process starts"""
+    global _worker_cv, _progress_queue, _load_seconds
+    start = time.perf_counter()
+    # Imported here so only worker processes pay for torch/ultralytics
+    from cv_processor import HybridGoaldleCV
+    _worker_cv = HybridGoaldleCV()
+    _progress_queue = progress_queue
+    _load_seconds = time.perf_counter() - start
+
+
+def _worker_ready() -> float:
+    """Seconds the worker took to import the CV stack and load the model"""
+    return _load_seconds
+
+
+def _run_job(job_id: str, video_bytes: bytes, batch_size: Optional[int]):
+    """Process one video in a worker; returns (blurred video bytes, video_info)"""
+    _progress_queue.put((job_id, 0, 0))
+
+    def report(frames_done, total_frames):
+        _progress_queue.put((job_id, frames_done, total_frames))
+
+    return _worker_cv.blur_video(video_bytes, batch_size, on_progress=report)
+
+
+@dataclass
+class VideoJob:
+    id: str
+    cache_key: str
+    status: str = "queued"  # queued, running, done, failed
+    frames_done: int = 0
+    total_frames: int = 0
+    cached: bool = False
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    video_info: Optional[Dict[str, Any]] = None
+    result: Optional[bytes] = None  # only kept when the cache can't hold the blurred video
+    future: Optional[Future] = None  # until the job finishes (a done future holds the result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = 1.0 if self.status == "done" else (
+            min(self.frames_done / self.total_frames, 1.0) if self.total_frames else 0.0)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": round(progress, 4),
+            "frames_done": self.frames_done,
+            "total_frames": self.total_frames,
+            "cached": self.cached,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "video_info": self.video_info
+        }
+
+
+class VideoJobManager:
+    """Runs video processing jobs on a pool of worker processes.
+
+    Each worker loads HybridGoaldleCV once and reuses it for every job, so
+    CPU-heavy processing never runs on the API's event loop. Submitting
+    returns immediately with a job id; progress is reported back from the
+    workers over a queue. Finished jobs are kept until max_finished_jobs
+    newer ones have completed; their blurred videos are read back from the
+    cache (see result_path), and only held in memory without one.
+
+    The pool starts on the first job, or earlier with warm_up(); model_state
+    says whether the workers have loaded the model yet. The stage timings
+    and counters of every clip the workers process are merged into
+    metrics (cache hits add nothing).
+    """
+    def __init__(self, cache: Optional[ProcessedVideoCache] = None, max_workers: int = 1,
+                 max_finished_jobs: int = 100):
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, VideoJob] = {}
+        self.finished_order = []
+        self.lock = threading.Lock()
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.progress_queue = None
+        self.progress_thread = None
+        self.model_state = "cold"  # cold, loading, ready, failed
+        self.model_error: Optional[str] = None
+        self.model_load_s: Optional[float] = None   # warm_up() call to every worker ready
+        self.worker_load_s: Optional[float] = None  # slowest worker's import + model load
+        self.warm_up_started: Optional[float] = None
+        self.metrics = PipelineMetrics()
+
+    def _ensure_pool(self):
+        """Start the worker pool on first use (not at import time)"""
+        with self.pool_lock:
+            if self.pool is not None:
+                return
+            # spawn: workers must not inherit the server's threads or a forked torch runtime
+            ctx = multiprocessing.get_context("spawn")
+            self.progress_queue = ctx.Queue()
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx,
+                                            initializer=_init_worker, initargs=(self.progress_queue,))
+            self.progress_thread = threading.Thread(target=self._drain_progress, daemon=True)
+            self.progress_thread.start()
+            if self.model_state == "cold":
+                self.model_state = "loading"
+
+    def warm_up(self):
+        """Start every worker now so the model is loaded before the first job (returns at once)"""
+        self.warm_up_started = time.perf_counter()
+        try:
+            self._ensure_pool()
+            futures = [self.pool.submit(_worker_ready) for _ in range(self.max_workers)]
+        except Exception as e:
+            self._set_model_state("failed", e)
+            return
+        pending = set(futures)
+        pending_lock = threading.Lock()
+
+        def on_ready(future):
+            error = future.exception()
+            with pending_lock:
+                pending.discard(future)
+                done = not pending
+            if error is None:
+                with self.lock:
+                    self.worker_load_s = round(max(self.worker_load_s or 0.0, future.result()), 3)
+            if error is not None:
+                self._set_model_state("failed", error)
+            elif done and self.model_state != "failed":
+                self._set_model_state("ready")
+
+        for future in futures:
+            future.add_done_callback(on_ready)
+
+    def _set_model_state(self, state: str, error: Optional[BaseException] = None):
+        with self.lock:
+            if state == "ready" and self.model_state != "ready" and self.warm_up_started is not None:
+                self.model_load_s = round(time.perf_counter() - self.warm_up_started, 3)
+            self.model_state = state
+            self.model_error = (str(error) or type(error).__name__) if error is not None else None
+
+    def _drain_progress(self):
+        while True:
+            message = self.progress_queue.get()
+            if message is None:
+                break
+            job_id, frames_done, total_frames = message
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is None or job.status in ("done", "failed"):
+                    continue
+                if job.status == "queued":
+                    job.status = "running"
+                    job.started_at = time.time()
+                job.frames_done = frames_done
+                job.total_frames = total_frames
+
+    def submit(self, video_bytes: bytes, params: Dict[str, Any], batch_size: Optional[int] = None) -> VideoJob:
+        """Queue a video for processing; returns at once (cache hits are done immediately)"""
+        cache_key = ProcessedVideoCache.make_key(video_bytes, params)
+        job = VideoJob(id=uuid.uuid4().hex, cache_key=cache_key)
+
+        # Only the video_info is read on a hit; the video stays on disk until requested
+        cached = self.cache.get_info(cache_key) if self.cache is not None else None
+        with self.lock:
+            self.jobs[job.id] = job
+            if cached is not None:
+                job.video_info = cached
+                job.cached = True
+                self._mark_finished(job, "done")
+                return job
+
+        try:
+            self._ensure_pool()
+            try:
+                job.future = self.pool.submit(_run_job, job.id, video_bytes, batch_size)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool
+                self.shutdown()
+                self._ensure_pool()
+                job.future = self.pool.submit(_run_job, job.id, video_bytes, batch_size)
+        except Exception as e:
+            with self.lock:
+                job.error = str(e) or type(e).__name__
+                self._mark_finished(job, "failed")
+            return job
+
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        return job
+
+    def _on_done(self, job: VideoJob, future: Future):
+        try:
+            result_bytes, video_info = future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._set_model_state("failed", e)
+            with self.lock:
+                job.error = str(e) or type(e).__name__
+                self._mark_finished(job, "failed")
+            return
+
+        if self.model_state != "ready":
+            self._set_model_state("ready")  # a job ran, so its worker has the model
+        stored = self.cache is not None and self.cache.put(job.cache_key, result_bytes, video_info)
+        with self.lock:
+            if "metrics" in video_info:
+                self.metrics.merge(video_info["metrics"])
+            job.result = None if stored else result_bytes
+            job.video_info = video_info
+            job.frames_done = video_info.get("frames", job.frames_done)
+            self._mark_finished(job, "done")
+
+    def _mark_finished(self, job: VideoJob, status: str):
+        """Record completion and drop the oldest finished jobs (caller holds the lock)"""
+        job.status = status
+        job.finished_at = time.time()
+        job.future = None  # its result would keep the blurred video in memory
+        self.finished_order.append(job.id)
+        while len(self.finished_order) > self.max_finished_jobs:
+            self.jobs.pop(self.finished_order.pop(0), None)
+
+    async def wait(self, job: VideoJob) -> VideoJob:
+        """Wait for a job without blocking the event loop"""
+        future = job.future  # None once the job has finished
+        if future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except Exception:
+                pass  # recorded on the job by _on_done
+        # The done callback may still be running in the pool's thread
+        while job.status not in ("done", "failed"):
+            await asyncio.sleep(0.01)
+        return job
+
+    def result_path(self, job: VideoJob) -> Optional[str]:
+        """Path of a done job's blurred video in the cache; None if it is held in memory or was evicted"""
+        if job.result is not None or self.cache is None:
+            return None
+        return self.cache.video_path(job.cache_key)
+
+    def read_result(self, job: VideoJob) -> Optional[bytes]:
+        """Blurred video of a done job, or None if it has left the cache (reads from disk)"""
+        if job.result is not None:
+            return job.result
+        path = self.result_path(job)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.max_workers, "pool_started": self.pool is not None, "jobs": counts}
+
+    def get_readiness(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "state": self.model_state,
+                "workers": self.max_workers,
+                "load_s": self.model_load_s,
+                "worker_load_s": self.worker_load_s,
+                "error": self.model_error
+            }
+
+    def metrics_text(self, caches: Dict[str, Dict[str, Any]]) -> str:
+        """Prometheus text of the merged clip metrics, the given caches' stats and the job counts"""
+        stats = self.get_stats()
+        readiness = self.get_readiness()
+        gauges = [("goaldle_cv_jobs", "Jobs kept by the manager, by status", {"status": status}, count)
+                  for status, count in stats["jobs"].items()]
+        gauges.append(("goaldle_cv_workers", "Worker processes", {}, self.max_workers))
+        gauges.append(("goaldle_cv_model_ready", "1 once the workers have loaded the model", {},
+                       int(readiness["state"] == "ready")))
+        with self.lock:
+            return render_prometheus(self.metrics, caches, gauges)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.progress_queue.put(None)
+            self.pool = None
+            self.model_state = "cold"
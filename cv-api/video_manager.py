@@ -1,21 +1,103 @@
 import json
 import os
-import base64
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 import random
 
+class VideoByteCache:
+    """In-memory LRU cache of video file bytes with a byte budget.
+    
+    Entries remember the file's mtime and size and are dropped as soon as
+    either changes on disk, so a re-processed video is never served stale.
+    """
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # path -> entry dict, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+    
+    def _drop(self, path: str):
+        self.total_bytes -= len(self.entries.pop(path)["data"])
+    
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+    
+    def _lookup(self, path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            self._drop(path)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(path)
+        self.hits += 1
+        return entry
+    
+    def get_bytes(self, path: str) -> Tuple[bytes, os.stat_result]:
+        """Return (file bytes, stat), reading from disk only on a miss or change"""
+        stat = os.stat(path)
+        with self.lock:
+            entry = self._lookup(path, stat)
+            if entry is not None:
+                return entry["data"], stat
+        
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        with self.lock:
+            # Only cache what fits; bigger files are still returned, just not kept
+            if stat.st_size <= self.max_bytes:
+                if path in self.entries:
+                    self._drop(path)
+                self.entries[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "data": data}
+                self.total_bytes += len(data)
+                self._evict()
+        return data, stat
+    
+    def fits(self, size: int) -> bool:
+        return size <= self.max_bytes
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
 class VideoManager:
-    def __init__(self, goals_db_path: str = "data/goals_db.json", goals_dir: str = "goals"):
+    def __init__(self, goals_db_path: str = "data/goals_db.json", goals_dir: str = "goals",
+                 cache_max_bytes: int = 256 * 1024 * 1024):
         self.goals_db_path = goals_db_path
         self.goals_dir = goals_dir
         self.blurred_dir = "goals/blurred"
         
+        # Hot videos are kept in memory so repeated plays don't touch disk
+        self.cache = VideoByteCache(cache_max_bytes)
+        
         # Create blurred directory if it doesn't exist
         os.makedirs(self.blurred_dir, exist_ok=True)
         
         # Load goals database
         with open(goals_db_path, 'r', encoding='utf-8') as f:
             self.goals_db = json.load(f)
+        self.goal_positions = {goal["id"]: i for i, goal in enumerate(self.goals_db)}
     
     def get_random_goal(self) -> Dict[str, Any]:
         """Get a random goal from the database"""
@@ -30,17 +112,13 @@ class VideoManager:
     
     def get_goal_by_id(self, goal_id: str) -> Optional[Dict[str, Any]]:
         """Get goal by ID"""
-        for goal in self.goals_db:
-            if goal["id"] == goal_id:
-                return goal
-        return None
+        index = self.goal_positions.get(goal_id)
+        return self.goals_db[index] if index is not None else None
     
-    def read_video_as_base64(self, video_path: str) -> str:
-        """Read video file and return as base64 string"""
+    def read_video_bytes(self, video_path: str) -> Tuple[bytes, os.stat_result]:
+        """Read video file (through the in-memory cache) and return (bytes, stat)"""
         try:
-            with open(video_path, 'rb') as f:
-                video_bytes = f.read()
-            return base64.b64encode(video_bytes).decode()
+            return self.cache.get_bytes(video_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Video file not found: {video_path}")
     
@@ -67,32 +145,48 @@ class VideoManager:
         
         return blurred_path
     
+    def get_original_video_path(self, goal: Dict[str, Any]) -> str:
+        """Get the path for the original version of a video"""
+        return goal["original_video"].replace("cv-api/", "")
+    
+    def get_video_path(self, goal: Dict[str, Any], kind: str) -> str:
+        """Get the path of the "blurred" or "original" video of a goal"""
+        if kind == "blurred":
+            return self.get_blurred_video_path(goal)
+        if kind == "original":
+            return self.get_original_video_path(goal)
+        raise ValueError(f"Unknown video kind: {kind}")
+    
+    def get_video_url(self, goal: Dict[str, Any], kind: str) -> str:
+        """URL of the streaming endpoint serving this video"""
+        return f"/videos/{goal['id']}/{kind}"
+    
     def get_video_pair(self, goal: Dict[str, Any]) -> Dict[str, str]:
-        """Get both original and blurred video as base64 - used for reveal"""
+        """Get URLs of both original and blurred video - used for reveal"""
         result = {
             "goal_id": goal["id"],
             "player_name": goal["scorer"]
         }
         
         # Get original video for reveal
-        original_path = goal["original_video"].replace("cv-api/", "")
-        try:
-            result["original_video"] = self.read_video_as_base64(original_path)
-        except FileNotFoundError:
-            result["original_video"] = None
+        original_path = self.get_original_video_path(goal)
+        if os.path.exists(original_path):
+            result["original_video_url"] = self.get_video_url(goal, "original")
+        else:
+            result["original_video_url"] = None
             result["error"] = f"Original video not found: {original_path}"
         
         # Get blurred video 
         blurred_path = self.get_blurred_video_path(goal)
-        try:
-            result["blurred_video"] = self.read_video_as_base64(blurred_path)
-        except FileNotFoundError:
-            result["blurred_video"] = None
+        if os.path.exists(blurred_path):
+            result["blurred_video_url"] = self.get_video_url(goal, "blurred")
+        else:
+            result["blurred_video_url"] = None
         
         return result
     
     def get_game_video(self, goal: Dict[str, Any]) -> Dict[str, str]:
-        """Get the blurred video for gameplay - ALWAYS return blurred video"""
+        """Get the blurred video URL for gameplay - ALWAYS return blurred video"""
         result = {
             "goal_id": goal["id"],
             "player_name": goal["scorer"]
@@ -100,11 +194,11 @@ class VideoManager:
         
         # ALWAYS return blurred video for gameplay
         blurred_path = self.get_blurred_video_path(goal)
-        try:
-            result["original_video"] = self.read_video_as_base64(blurred_path)  # Use "original_video" key but send blurred
+        if os.path.exists(blurred_path):
+            result["video_url"] = self.get_video_url(goal, "blurred")
             result["video_type"] = "blurred"
-        except FileNotFoundError:
-            result["original_video"] = None
+        else:
+            result["video_url"] = None
             result["error"] = f"Blurred video not found: {blurred_path}"
         
         return result
@@ -0,0 +1,190 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional
+
+import cv2
+import numpy as np
+
+# Marks the end of a stream in a stage queue
+_END = object()
+
+
+class StageTimer:
+    """Busy/wait time accounting for one pipeline stage"""
+    def __init__(self):
+        self.busy = 0.0   # seconds doing real work
+        self.wait = 0.0   # seconds blocked on a queue (starved or backpressured)
+        self.frames = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "busy_s": round(self.busy, 4),
+            "wait_s": round(self.wait, 4),
+            "frames": self.frames,
+            "ms_per_frame": round(1000 * self.busy / self.frames, 3) if self.frames else 0.0
+        }
+
+
+class VideoPipeline:
+    """Decode -> process -> encode pipeline joined by bounded queues.
+
+    A decoder thread reads frames into a bounded queue, the calling thread
+    pulls them in batches and runs process_batch, and an encoder thread
+    writes the results. Full queues block the producer (backpressure), and
+    FIFO queues with a single consumer per stage keep frame order.
+
+    With metrics (a metrics.PipelineMetrics), the decode and encode time of
+    every frame is recorded in it as well.
+    """
+    def __init__(self, process_batch: Callable[[List[np.ndarray]], List[np.ndarray]],
+                 batch_size: int = 8, queue_size: int = 32, fourcc: str = 'H264', metrics=None):
+        self.process_batch = process_batch
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(queue_size, self.batch_size)
+        self.fourcc = fourcc
+        self.metrics = metrics
+
+    def _put(self, q: queue.Queue, item, stop: threading.Event, timer: StageTimer) -> bool:
+        """Blocking put that gives up once the pipeline is stopping"""
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                timer.wait += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, stop: threading.Event, timer: StageTimer):
+        """Blocking get that returns _END once the pipeline is stopping"""
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=0.1)
+                timer.wait += time.perf_counter() - start
+                return item
+            except queue.Empty:
+                continue
+        return _END
+
+    def _decode(self, cap, frames_q, stop, timer, errors):
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                ret, frame = cap.read()
+                elapsed = time.perf_counter() - start
+                timer.busy += elapsed
+                if not ret:
+                    break
+                if self.metrics is not None:
+                    self.metrics.observe("decode", elapsed, timer.frames)
+                timer.frames += 1
+                if not self._put(frames_q, frame, stop, timer):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            self._put(frames_q, _END, stop, timer)
+
+    def _encode(self, out, results_q, stop, timer, errors):
+        try:
+            while True:
+                frame = self._get(results_q, stop, timer)
+                if frame is _END:
+                    break
+                start = time.perf_counter()
+                out.write(frame)
+                elapsed = time.perf_counter() - start
+                timer.busy += elapsed
+                if self.metrics is not None:
+                    self.metrics.observe("encode", elapsed, timer.frames)
+                timer.frames += 1
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    def run(self, input_path: str, output_path: str,
+            on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Process input_path into output_path and return video info with stage timings.
+
+        on_progress(frames_done, total_frames) is called after every batch;
+        total_frames is the container's frame count estimate (0 if unknown).
+        """
+        cap = cv2.VideoCapture(input_path)
+        if not cap.isOpened():
+            raise ValueError("Could not open video")
+
+        fps = int(cap.get(cv2.CAP_PROP_FPS))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*self.fourcc), fps, (width, height))
+
+        frames_q = queue.Queue(maxsize=self.queue_size)
+        results_q = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors = []
+        timers = {"decode": StageTimer(), "inference": StageTimer(), "encode": StageTimer()}
+
+        decoder = threading.Thread(target=self._decode, args=(cap, frames_q, stop, timers["decode"], errors), daemon=True)
+        encoder = threading.Thread(target=self._encode, args=(out, results_q, stop, timers["encode"], errors), daemon=True)
+        wall_start = time.perf_counter()
+        decoder.start()
+        encoder.start()
+
+        try:
+            infer = timers["inference"]
+            finished = False
+            while not finished:
+                # Gather a batch (stops early at end of stream)
+                batch = []
+                while len(batch) < self.batch_size:
+                    frame = self._get(frames_q, stop, infer)
+                    if frame is _END:
+                        finished = True
+                        break
+                    batch.append(frame)
+                if not batch:
+                    break
+
+                start = time.perf_counter()
+                processed = self.process_batch(batch)
+                infer.busy += time.perf_counter() - start
+                infer.frames += len(batch)
+                if on_progress is not None:
+                    on_progress(infer.frames, total_frames)
+
+                for frame in processed:
+                    if not self._put(results_q, frame, stop, infer):
+                        break
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            self._put(results_q, _END, stop, timers["inference"])
+            decoder.join()
+            encoder.join()
+            cap.release()
+            out.release()
+
+        if errors:
+            raise errors[0]
+
+        wall = time.perf_counter() - wall_start
+        stage_timings = {name: timer.as_dict() for name, timer in timers.items()}
+        frame_count = timers["encode"].frames
+        return {
+            "fps": fps,
+            "width": width,
+            "height": height,
+            "frames": frame_count,
+            "pipeline": {
+                "wall_s": round(wall, 4),
+                "throughput_fps": round(frame_count / wall, 2) if wall > 0 else 0.0,
+                "bottleneck": max(timers, key=lambda name: timers[name].busy),
+                "stages": stage_timings
+            }
+        }
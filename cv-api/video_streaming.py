@@ -0,0 +1,111 @@
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from video_manager import VideoManager
+
+
+def video_etag(stat: os.stat_result) -> str:
+    """Strong validator derived from the file's mtime and size"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against a file's validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=start-end' range into inclusive offsets.
+
+    Returns None for anything else (multiple ranges, other units), in which
+    case the whole file is sent. Raises 416 for unsatisfiable ranges.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_s, _, end_s = spec.strip().partition("-")
+    try:
+        if start_s:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(end_s), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+
+def video_response(request: Request, video_manager: VideoManager, path: str) -> Response:
+    """Serve a video with Range, ETag and Last-Modified support.
+
+    Videos that fit the VideoManager's memory budget are served from its
+    byte cache (after the first request no disk reads, only a stat to
+    detect changes). Larger ones are streamed by FileResponse, which uses
+    zero-copy sendfile when the server supports the pathsend extension.
+    It reads files synchronously, so call it from a worker thread.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Video file not found")
+
+    etag = video_etag(stat)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache"
+    }
+    if is_not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if request.method == "HEAD":
+        # The size is all HEAD needs; don't read (and cache) the body
+        headers["Content-Length"] = str(stat.st_size)
+        return Response(status_code=200, media_type="video/mp4", headers=headers)
+
+    if not video_manager.cache.fits(stat.st_size):
+        return FileResponse(path, media_type="video/mp4", stat_result=stat, headers=headers)
+
+    try:
+        data, stat = video_manager.read_video_bytes(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Video file not found")
+    # The file may have changed between the stat above and the read
+    headers["ETag"] = video_etag(stat)
+    headers["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == headers["ETag"]):
+        byte_range = parse_range(range_header, len(data))
+
+    if byte_range is None:
+        return Response(content=data, media_type="video/mp4", headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    # memoryview slice avoids copying the cached bytes
+    return Response(content=memoryview(data)[start:end + 1], status_code=206, media_type="video/mp4", headers=headers)